@@ -21,13 +21,16 @@ This script does the following.
         i) E: Upgrade to version (Version/Revisit/NA)
         j) H: Status (Not Started, Ongoing, PR Raised, PR in Review, Done-Upgrade, Done-FixBuild, Done-OtherChanges, NA-Uptodate)
         k) U: Logs any obvious remarks 
+        l) V: Fedora src rpm size & last modified date
     4) This code tries to find the fedora package information from fedora git if it fails to find the data from packages url 
     5) This code tries to extract the fedora version and release info from 'https://kojipkgs.fedoraproject.org/packages/'
 Note: This script does the 1st pass auto analysis to figure out if a package upgraded is needed or not. 
     Any cell color coded other than "White" / labeled "Not_Found" must be reviewed developers.        
 
 Usage:
-  python3 pkg_update_analysis-<version>.py
+  python3 pkg_update_analysis-<version>.py [--incremental] [--resume]
+  python3 pkg_update_analysis-<version>.py --bench-html <dir of saved koji pages>
+  python3 pkg_update_analysis-<version>.py --bench-versions [file with one version per line]
 
 Options:
   GUI based : Please enter paths for workbook, build_state.csv, and SPECS-EXTENDED for 2.0 & 3.0
@@ -35,13 +38,23 @@ Options:
 
 import openpyxl
 from openpyxl.styles import Color, PatternFill, Font, Border
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.utils import get_column_letter
+from openpyxl.worksheet.dimensions import ColumnDimension
+import xml.etree.ElementTree as ElementTree
+from xml.parsers.expat import ExpatError
+from copy import copy
 from bs4 import BeautifulSoup
+import argparse
 import time
 from typing import Any, Callable
-from functools import wraps
+from functools import wraps, lru_cache
 import requests
+from requests.adapters import HTTPAdapter
 import pandas as pd
+import numpy as np
 import datetime
+import io
 import os
 import re
 import tkinter as tk
@@ -51,12 +64,40 @@ from pathlib import Path
 from tkinter import messagebox
 import subprocess
 import logging
+import csv
+import json
+import hashlib
+import email.utils
+import shutil
+import threading
+import xmlrpc.client
+import random
+import asyncio
+from collections import namedtuple
 # import psutil
 import git  # pip install gitpython
 from packaging.version import Version
 from pyrpm.spec import Spec, replace_macros
 from datetime import datetime
-from urllib.parse import unquote
+from urllib.parse import unquote, urlparse
+from concurrent.futures import ThreadPoolExecutor
+try:
+    import pyarrow.csv as pa_csv # optional, streams large build_state.csv exports faster than pandas
+except ImportError:
+    pa_csv = None
+try:
+    import aiohttp # optional, asyncio fetch engine for the fedora lookups
+except ImportError:
+    aiohttp = None
+try:
+    from selectolax.lexbor import LexborHTMLParser # optional, fastest html_parser_backend
+except ImportError:
+    LexborHTMLParser = None
+try:
+    import lxml.html as lxml_html
+    import lxml.etree as lxml_etree
+except ImportError:
+    lxml_html = None
 
 # from git import Repo
 
@@ -73,12 +114,18 @@ build_state = ''
 code_dir_3_0 = ''
 code_dir_2_0 = ''
 
-# extract_fedora_info_from_kojipkgs = True
-# kojipkgs_url = 'https://kojipkgs.fedoraproject.org/packages/'
+extract_fedora_info_from_kojipkgs = True
+kojipkgs_url = 'https://kojipkgs.fedoraproject.org/packages/'
 extract_fedora_info_from_kojipkgs_pkgid = True
 koji_pkgid_url = 'https://koji.fedoraproject.org/koji/packageinfo?packageID='
+extract_fedora_info_from_koji_hub = False # True: query the koji hub XML-RPC API in multiCall batches instead of scraping the packageinfo pages, takes precedence over the flags above
+koji_hub_url = 'https://koji.fedoraproject.org/kojihub'
+koji_hub_batch_size = 100 # pkgs per multiCall round trip
+koji_hub_builds_limit = 50 # latest complete builds of a pkg looked at for a fedora release
 entries = []
 pkg_list = []
+pkg_row_index = {} # pkg name -> list of worksheet row numbers
+duplicate_pkgs = {} # pkg name -> list of worksheet row numbers, for pkgs listed in more than one row
 
 revisit_color = "CCD519" #yellow
 white_color = "FFFFFF"
@@ -87,8 +134,89 @@ orange_color = "FF6433"
 cur_stable_fedora_rel = 'fc41'
 fedora_git_branch='f41'
 special_chars = ",!?~^*%$#@"
+kojipkgs_listings = {} # kojipkgs directory url -> (status_code, DirEntry list), every listing is fetched and parsed once per run
+kojipkgs_listings_lock = threading.Lock()
+html_parser_backend = 'auto' # 'selectolax', 'lxml' or 'bs4' parser of the koji / kojipkgs pages, 'auto' = the fastest one installed
 
 tmp_git_dir = 'tmp-git-dir'
+fedora_git_raw_spec = True # git fallback fetches only <pkg>.spec of the branch over http, the dist-git repo is cloned only if that fails
+git_mirror_dir = '' # '' = cache_dir/git-mirrors, bare mirrors of the fedora dist-git repos reused by the next runs
+git_mirror_ttl = 24 * 3600 # seconds a mirror is used as is, after that it is updated with an incremental git fetch
+git_mirror_max_bytes = 2 * 1024 * 1024 * 1024 # disk cap of the mirrors, the least recently used are pruned above it
+git_mirror_workers = 8 # mirrors updated at once by update_git_mirrors
+git_mirrors = None # pkg -> {fetched, accessed, size}, loaded from git_mirror_dir on first use
+git_mirrors_lock = threading.Lock()
+git_mirrors_dirty = False
+git_mirror_locks = {} # pkg -> lock held while its mirror is cloned or fetched
+cache_dir = '.pkg-analysis-cache' # caches persisted between runs
+spec_indexes = {} # tree directory -> SpecFileIndex
+spec_indexes_lock = threading.Lock()
+spec_parse_cache = None # spec path -> {mtime_ns, size, sha1}, loaded from cache_dir on first use
+spec_records = {} # spec content sha1 -> SpecRecord
+spec_parse_cache_lock = threading.Lock()
+spec_parse_cache_dirty = False
+
+fedora_lookup_workers = 8 # pkgs resolved at once by update_latest_fedora_pkg_info, 1 = one after another
+http_max_per_host = 4 # max requests in flight to a single host
+http_host_limits = {} # per host override of http_max_per_host, ex. {'koji.fedoraproject.org': 2}
+http_host_semaphores = {}
+http_host_semaphores_lock = threading.Lock()
+http_timeout = (10, 60) # (connect, read) timeout in seconds of every request
+http_retries = 3 # retries of a request failing with a http_retry_statuses status or a http_retry_exceptions exception
+http_backoff = 0.5 # base of the jittered exponential backoff between retries, in seconds
+http_session = None # requests.Session shared by all the network helpers, keeps connections alive per host
+http_session_lock = threading.Lock()
+async_conn_stats = {'new': 0, 'reused': 0} # connections opened / reused by the asyncio fetch engine
+http_retry_statuses = (429, 500, 502, 503, 504) # statuses retried by http_get(), a Retry-After in the answer is honoured
+# exceptions retried by http_get(): connection errors & resets, timeouts, and bodies cut or garbled by a reset mid read
+http_retry_exceptions = (requests.ConnectionError, requests.Timeout, requests.exceptions.ChunkedEncodingError, requests.exceptions.ContentDecodingError)
+async_retry_exceptions = (aiohttp.ClientConnectionError, aiohttp.ClientPayloadError, asyncio.TimeoutError) if aiohttp != None else () # same for the asyncio fetch engine
+http_slow_seconds = 20 # an answer slower than this is a congestion signal, the concurrency of its host is lowered
+http_retry_after_max = 120 # longest Retry-After honoured, in seconds
+http_breaker_failures = 5 # failures in a row (connection error, timeout, 5xx) opening the circuit breaker of a host
+http_breaker_cooldown = 60 # seconds an open circuit breaker fails the requests to its host at once, then one probe request is let through
+http_host_controllers = {} # host -> HostController
+http_host_controllers_lock = threading.Lock()
+fedora_source_chain = ['koji_hub', 'kojipkgs_pkgid', 'kojipkgs', 'pkg_url'] # the resolver fails over along this chain when the host of a source is down
+http_cache_enabled = True # keep the fetched pages in cache_dir/http-cache, reused by the next runs
+http_cache_ttl = 6 * 3600 # seconds a cached page is used as is, after that it is revalidated with ETag / Last-Modified
+http_cache_max_bytes = 512 * 1024 * 1024 # size cap of the cached bodies, the least recently used are evicted above it
+http_cache_max_entry_bytes = 4 * 1024 * 1024 # bigger bodies are not cached
+http_offline = False # True: pages are only replayed from the http cache, a miss returns a synthetic 504, nothing is sent to the network
+http_cache = None # url -> {status, headers, body, size, fetched, accessed}, loaded from cache_dir on first use
+src_link_cache = {} # src rpm url -> SrcLinkInfo, urls verified in this run
+src_link_cache_lock = threading.Lock()
+http_cache_lock = threading.Lock()
+http_cache_dirty = False
+fedora_async_fetch = False # True: resolve the fedora lookups with the asyncio fetch engine when aiohttp is installed, else the thread pool
+async_max_in_flight = 1000 # max requests in flight across all hosts with the asyncio fetch engine
+async_max_per_host = None # max requests in flight to a single host with the asyncio fetch engine, None = http_max_per_host, http_host_limits still overrides it
+
+build_state_chunk_rows = 100000 # rows per chunk when build_state.csv is streamed with pandas
+build_state_map = {} # build_state pkg name -> (State, artifact version)
+pkg_version_splitter = re.compile(r"-(?=\d)") # 'bash-5.2.15-3.azl3' -> ['bash', '5.2.15', '3.azl3']
+rpm_version_token_pattern = re.compile(r'~|\^|\d+|[a-zA-Z]+') # rpmvercmp segments, every other char is a separator
+
+xl_checkpoint_every = 0 # save the workbook after these many cell writes, 0 = save only once at the end of the run
+xl_streaming_mode = False # True: stream the workbook with read_only/write_only openpyxl, for sheets with tens of thousands of rows
+xl_session = None
+# worksheet parts a streamed save keeps or can safely rewrite, see get_streaming_blockers()
+streamed_sheet_parts = ('sheetPr', 'dimension', 'sheetViews', 'sheetFormatPr', 'cols', 'sheetData', 'printOptions', 'pageMargins', 'pageSetup', 'headerFooter')
+# columns owned by the pipeline: D, E, H, M, N, O, P, Q, R, T, U, V
+pkg_table_cols = [4, 5, 8, 13, 14, 15, 16, 17, 18, 20, 21, 22]
+pkg_table = None
+shared_fills = {} # fill color -> PatternFill, one style object shared by every written cell of that color
+xl_change_set = [] # one dict (package, column, row, old, new, old_color, new_color) per cell changed in this run
+xl_change_set_file = '' # '' = <workbook name>_changes.csv next to the workbook
+incremental_mode = False # --incremental: the per pkg stages only re-evaluate the pkgs whose inputs changed since the last incremental run
+incremental_state = None # stage -> pkg -> {fp: input fingerprint, writes: [[col, value, color], ...]}, loaded from cache_dir on first use
+incremental_state_dirty = False
+stage_writes = None # pkg -> cells written by the stage chunk being run, None = not recording
+stage_failed = None # pkgs of the stage chunk being run whose lookups failed, they are neither journaled nor stored for incremental runs
+resume_mode = False # --resume: the (stage, pkg) results journaled by an interrupted run are replayed instead of computed again
+run_journal_chunk = 200 # pkgs per journaled stage chunk, a crash loses at most the chunk in progress
+run_journal = None # write-ahead journal of the run, open from start_run_journal() to close_run_journal()
+run_journal_done = {} # stage -> pkg -> journal record of the interrupted run, loaded on --resume
 
 # Create and configure logger
 logging.basicConfig(filename="pkg_update_analysis.log",
@@ -119,20 +247,475 @@ def is_file_open(filepath):
             pass  # Process might have terminated
     return False
 
-def read_all_pkg_names():
-    """Load the workbook
-       Access the worksheet (assuming it's the first sheet) 
-       Read the values from column 'C'
+
+class WorkbookSession:
+    """Keeps the workbook loaded in memory for the whole run.
+       Every stage writes into the same worksheet, the workbook is saved to disk
+       only on flush() or after every 'checkpoint_every' cell writes
+       In streaming mode the workbook is never fully loaded, rows are read with a read_only
+       workbook and written back with a write_only workbook on flush(). Streaming falls back to
+       a full load when the workbook has parts a streamed save would drop, see get_streaming_blockers()
+    """
+
+    def __init__(self, path, checkpoint_every=0, streaming=False):
+        self.path = path
+        self.checkpoint_every = checkpoint_every
+        self.opened_stat = get_file_stat(path) # workbook as found on disk, before this run saved it
+        if streaming:
+            blockers = get_streaming_blockers(path)
+            if blockers:
+                logger.warning(f'WARNING: streaming mode disabled, a streamed save would drop the {", ".join(blockers)} of {path}')
+                print(f'WARNING: streaming mode disabled, a streamed save would drop the {", ".join(blockers)} of {path}')
+                streaming = False
+        self.streaming = streaming
+        if streaming:
+            self.wb = None
+            self.ws = StreamingSheetView(path)
+        else:
+            self.wb = openpyxl.load_workbook(path)
+            self.ws = self.wb.active
+        self.pending_writes = 0
+        self.saves = 0
+        self.table = None # PackageTable exported into the worksheet on every flush
+
+    def mark_dirty(self, count=1):
+        """Records cell writes and saves the workbook when a checkpoint is reached
+
+        Args:
+            count (int): number of cells written
+        """
+        self.pending_writes += count
+        if self.checkpoint_every and self.pending_writes >= self.checkpoint_every:
+            logger.info(f'checkpoint: saving {self.pending_writes} pending cell writes')
+            self.flush()
+
+    def flush(self):
+        """Saves the workbook if there are pending writes
+        """
+        if self.pending_writes == 0:
+            return
+        if self.streaming:
+            write_streamed_workbook(self.path, self.table, pkg_row_index)
+        else:
+            if self.table != None:
+                self.table.export(self.ws, pkg_row_index)
+            self.wb.save(self.path)
+        journal_workbook_stat(self.path)
+        self.saves += 1
+        logger.info(f'workbook saved: {self.path} writes = {self.pending_writes} saves so far = {self.saves}')
+        self.pending_writes = 0
+
+
+class PackageTable:
+    """Columnar in-memory copy of the columns owned by the pipeline (see pkg_table_cols)
+       Stages read and write values & colors here, the worksheet is only touched
+       when the table is imported at the start and exported on every session flush
+    """
+
+    def __init__(self, pkgs, cols):
+        self.pkgs = list(pkgs)
+        self.pos = {pkg: i for i, pkg in enumerate(self.pkgs)}
+        self.cols = list(cols)
+        n = len(self.pkgs)
+        self.values = {col: [None] * n for col in self.cols}
+        self.colors = {col: [None] * n for col in self.cols} # None = keep the fill found in the workbook
+        self.dirty = {col: [False] * n for col in self.cols} # written since the last export
+
+    @classmethod
+    def from_worksheet(cls, ws, row_index, cols):
+        """Imports the current values of the given columns for every indexed package
+
+        Args:
+            ws (Any): worksheet
+            row_index (dict): pkg name -> list of row numbers
+            cols (list): column numbers
+
+        Returns:
+            PackageTable: table holding the values found in the first row of every package
+        """
+        table = cls(row_index.keys(), cols)
+        first_row = {rows[0]: table.pos[pkg] for pkg, rows in row_index.items()}
+        for row_num, row in enumerate(ws.iter_rows(min_row=3, max_col=max(cols), values_only=True), start=3):
+            i = first_row.get(row_num)
+            if i == None:
+                continue
+            for col in table.cols:
+                if col <= len(row):
+                    table.values[col][i] = row[col-1]
+        return table
+
+    def get(self, pkg, col):
+        return self.values[col][self.pos[pkg]]
+
+    def set(self, pkg, col, val, color=None):
+        """Updates the value and fill color of a given package & column
+
+        Args:
+            pkg (string): package name
+            col (int): column number
+            val (Any): value
+            color (string): fill color, None keeps the current fill
+        """
+        i = self.pos[pkg]
+        self.values[col][i] = val
+        self.colors[col][i] = color
+        self.dirty[col][i] = True
+
+    def column(self, col):
+        """Returns the values of a column in pkg order
+        """
+        return self.values[col]
+
+    def export(self, ws, row_index):
+        """Writes the cells updated since the last export into the worksheet
+           Only cells whose value or fill color differ from the worksheet are written
+
+        Args:
+            ws (Any): worksheet
+            row_index (dict): pkg name -> list of row numbers
+
+        Returns:
+            int: number of cells written
+        """
+        count = 0
+        for col in self.cols:
+            values = self.values[col]
+            colors = self.colors[col]
+            dirty = self.dirty[col]
+            for i, pkg in enumerate(self.pkgs):
+                if not dirty[i]:
+                    continue
+                for row in row_index.get(pkg, []):
+                    cell = ws.cell(row=row, column=col)
+                    if apply_cell_change(cell, cell, pkg, row, col, values[i], colors[i]):
+                        count += 1
+                dirty[i] = False
+        logger.info(f'exported {count} changed cells into the worksheet')
+        return count
+
+
+def get_shared_fill(color):
+    """Returns the solid PatternFill of a color, the same object is reused for every cell
+
+    Args:
+        color (string): fill color, ex. 'CCD519'
+
+    Returns:
+        PatternFill: fill
+    """
+    fill = shared_fills.get(color)
+    if fill == None:
+        fill = PatternFill("solid", fgColor=color)
+        shared_fills[color] = fill
+    return fill
+
+
+def get_fill_color(fill):
+    """Returns the RGB color of a solid fill, ex. 'FFCCD519' -> 'CCD519'
+
+    Args:
+        fill (Any): cell fill, can be None
+
+    Returns:
+        string: color, None if the cell has no solid fill
+    """
+    if fill == None or fill.fill_type != 'solid' or not isinstance(fill.fgColor.rgb, str):
+        return None
+    return fill.fgColor.rgb[-6:].upper()
+
+
+def apply_cell_change(src, dst, pkg, row, col, val, color):
+    """Writes a new value & fill color into dst only if they differ from src and records the change
+
+    Args:
+        src (Any): cell holding the current value & fill, None for a missing cell
+        dst (Any): cell to write, same as src unless the workbook is streamed
+        pkg (string): package name
+        row (int): row number
+        col (int): column number
+        val (Any): new value
+        color (string): new fill color, None keeps the current fill
+
+    Returns:
+        bool: True if the cell changed
+    """
+    old_val = src.value if src is not None else None
+    old_color = get_fill_color(src.fill) if src is not None else None
+    new_color = color.upper() if color != None else old_color
+    if old_val == val and old_color == new_color:
+        return False
+    if old_val != val:
+        dst.value = val
+    if new_color != old_color:
+        dst.fill = get_shared_fill(new_color)
+    xl_change_set.append({'package': pkg, 'column': get_column_letter(col), 'row': row,
+                          'old': old_val, 'new': val, 'old_color': old_color, 'new_color': new_color})
+    return True
+
+
+def write_change_set():
+    """Writes the cells changed in this run into a csv file, one row per cell
+
+    Returns:
+        string: csv file path
+    """
+    path = xl_change_set_file or f'{os.path.splitext(workbook)[0]}_changes.csv'
+    fields = ['package', 'column', 'row', 'old', 'new', 'old_color', 'new_color']
+    with open(path, 'w', newline='', encoding='utf8') as f:
+        writer = csv.DictWriter(f, fieldnames=fields)
+        writer.writeheader()
+        writer.writerows(xl_change_set)
+    logger.info(f'{len(xl_change_set)} changed cells written into {path}')
+    print(f'{len(xl_change_set)} changed cells, see {path}')
+    return path
+
+
+def clean_pkg_name(name):
+    """Removes spaces from around the pkg name and the version number after it, ex. 'bash-5.2.15 ' -> 'bash'
+
+    Args:
+        name (string): pkg name from column 'C'
+
+    Returns:
+        string: pkg name
+    """
+    return pkg_version_splitter.split(name.strip(' \t\n\r'))[0]
+
+
+def is_empty_xl_row(row_num, row):
+    """Rows without a serial number in column 'B' are empty, row 1 is always kept
+
+    Args:
+        row_num (int): row number
+        row (tuple): row values
+
+    Returns:
+        bool: True if the row must be deleted
     """
+    return row_num > 1 and (len(row) < 2 or row[1] is None)
+
+
+class StreamingSheetView:
+    """Read-only view of the active sheet of a workbook on disk for streaming mode.
+       Every iter_rows() call streams the sheet from disk, empty rows are dropped and pkg
+       names are cleaned up the same way cleanup_xl_sheet() does, so the row numbers match
+       the rows written by write_streamed_workbook()
+    """
+
+    def __init__(self, path):
+        self.path = path
+
+    def iter_rows(self, min_row=1, max_col=None, values_only=True):
+        wb = openpyxl.load_workbook(self.path, read_only=True)
+        try:
+            out_row = 0
+            for row_num, row in enumerate(wb.active.iter_rows(max_col=max_col, values_only=True), start=1):
+                if is_empty_xl_row(row_num, row):
+                    continue
+                out_row += 1
+                if out_row < min_row:
+                    continue
+                if out_row >= 3 and len(row) > 2 and row[2] != None:
+                    row = row[:2] + (clean_pkg_name(row[2]),) + row[3:]
+                yield row
+        finally:
+            wb.close()
+
+
+def read_column_widths(ws):
+    """Reads the <cols> element of a read_only worksheet, read_only worksheets do not load column dimensions
+
+    Args:
+        ws (Any): read_only worksheet
+
+    Returns:
+        list: (min, max, width) for every column group with a width
+    """
+    widths = []
+    try:
+        with ws._get_source() as src:
+            for _, elem in ElementTree.iterparse(src, events=('start',)):
+                tag = elem.tag.split('}')[-1]
+                if tag == 'col' and elem.get('width') != None:
+                    widths.append((int(elem.get('min')), int(elem.get('max')), float(elem.get('width'))))
+                elif tag == 'sheetData': # <cols> always comes before the cell data
+                    break
+    except Exception as e:
+        logger.exception(f'Error reading column widths: {e}')
+    return widths
+
+
+def get_streaming_blockers(path):
+    """Lists what write_streamed_workbook() can not carry over from the workbook: other sheets,
+       frozen panes and any worksheet part besides the cell data and column widths
+       (merged cells, data validation, conditional formatting, auto filters, ...)
+       The sheet xml is parsed as a stream, the rows are dropped as soon as they are read
+
+    Args:
+        path (string): workbook path
+
+    Returns:
+        list: names of the parts a streamed save would drop, empty if the workbook can be streamed
+    """
+    blockers = []
+    wb = openpyxl.load_workbook(path, read_only=True)
+    try:
+        if len(wb.sheetnames) > 1:
+            blockers.append('other sheets')
+        with wb.active._get_source() as src:
+            depth = 0
+            sheet_data = None
+            for event, elem in ElementTree.iterparse(src, events=('start', 'end')):
+                tag = elem.tag.split('}')[-1]
+                if event == 'start':
+                    depth += 1
+                    if depth == 2 and tag == 'sheetData':
+                        sheet_data = elem
+                    elif depth == 2 and tag not in streamed_sheet_parts and tag not in blockers:
+                        blockers.append(tag)
+                    elif tag == 'pane' and 'pane' not in blockers:
+                        blockers.append('pane')
+                else:
+                    depth -= 1
+                    if tag == 'row' and sheet_data != None:
+                        sheet_data.remove(elem)
+    finally:
+        wb.close()
+    return blockers
+
+
+def copy_cell_style(src, dst):
+    """Copies the style of a read_only cell into a write_only cell
+    """
+    if getattr(src, 'has_style', False):
+        dst.font = copy(src.font)
+        dst.fill = copy(src.fill)
+        dst.border = copy(src.border)
+        dst.alignment = copy(src.alignment)
+        dst.number_format = src.number_format
+
+
+def write_streamed_workbook(path, table, row_index):
+    """Streams the workbook row by row from a read_only workbook into a write_only workbook
+       Empty rows are dropped, pkg names are cleaned up and the package table values are applied.
+       Cell values, styles and column widths are carried over, peak memory does not grow with the row count
+
+    Args:
+        path (string): workbook path, it is replaced by the new workbook
+        table (PackageTable): values to apply, can be None
+        row_index (dict): pkg name -> list of row numbers
+    """
+    row_to_pkg = {}
+    if table != None:
+        for pkg, rows in row_index.items():
+            for row in rows:
+                row_to_pkg[row] = table.pos[pkg]
+    max_col = max(table.cols) if table != None else 0
+
+    src_wb = openpyxl.load_workbook(path, read_only=True)
+    out_wb = openpyxl.Workbook(write_only=True)
+    try:
+        src_ws = src_wb.active
+        out_ws = out_wb.create_sheet(title=src_ws.title)
+        for min_col, max_col_width, width in read_column_widths(src_ws):
+            letter = get_column_letter(min_col)
+            out_ws.column_dimensions[letter] = ColumnDimension(out_ws, index=letter, min=min_col, max=max_col_width, width=width, customWidth=True)
+
+        out_row = 0
+        for row_num, row in enumerate(src_ws.iter_rows(), start=1):
+            if is_empty_xl_row(row_num, [c.value for c in row[:2]]):
+                continue
+            out_row += 1
+            i = row_to_pkg.get(out_row)
+            cells = []
+            for col in range(1, max(len(row), max_col if i != None else 0) + 1):
+                src = row[col-1] if col <= len(row) else None
+                value = src.value if src is not None else None
+                if col == 3 and out_row >= 3 and value != None:
+                    value = clean_pkg_name(value)
+                cell = WriteOnlyCell(out_ws, value=value)
+                if src is not None:
+                    copy_cell_style(src, cell)
+                if i != None and col in table.values and table.dirty[col][i]:
+                    apply_cell_change(src, cell, table.pkgs[i], out_row, col, table.values[col][i], table.colors[col][i])
+                cells.append(cell)
+            out_ws.append(cells)
+    finally:
+        src_wb.close()
+
+    tmp_path = f'{path}.tmp'
+    out_wb.save(tmp_path)
+    os.replace(tmp_path, path)
+    if table != None:
+        for col in table.cols:
+            table.dirty[col] = [False] * len(table.pkgs)
+    logger.info(f'workbook streamed into {path}: rows = {out_row}')
+
+
+def open_xl_session():
+    """Loads the workbook once for the run
+    """
+    global xl_session
     logger.info(f'workbook={workbook}')
-    wb = openpyxl.load_workbook(workbook)  
-    ws = wb.active
-    
-    for row in ws.iter_rows(min_row=3, values_only=True): #min_row=3 as pkg names start from row 3
-        
+    xl_session = WorkbookSession(workbook, xl_checkpoint_every, xl_streaming_mode)
+    return xl_session
+
+
+def close_xl_session():
+    """Saves all pending writes and releases the workbook
+    """
+    global xl_session
+    if xl_session != None:
+        xl_session.flush()
+        xl_session = None
+        write_change_set()
+
+
+def build_pkg_row_index(ws):
+    """Builds the pkg name -> row numbers index from column 'C'
+       Pkgs found in more than one row are flagged in duplicate_pkgs
+
+    Args:
+        ws (Any): worksheet
+    """
+    pkg_row_index.clear()
+    duplicate_pkgs.clear()
+    for row_num, row in enumerate(ws.iter_rows(min_row=3, max_col=3, values_only=True), start=3): #min_row=3 as pkg names start from row 3
         if row[2] != None:
             pkg = row[2].strip(' \t\n\r')
-            pkg_list.append(pkg) # row[2] = our col 'C'
+            pkg_row_index.setdefault(pkg, []).append(row_num)
+
+    for pkg, rows in pkg_row_index.items():
+        if len(rows) > 1:
+            duplicate_pkgs[pkg] = rows
+
+
+def get_pkg_rows(pkg):
+    """Returns the worksheet rows of a given package
+
+    Args:
+        pkg (string): package name
+
+    Returns:
+        list: row numbers, empty if the pkg is not in the workbook
+    """
+    return pkg_row_index.get(pkg, [])
+
+
+def read_all_pkg_names():
+    """Access the worksheet of the open workbook session (assuming it's the first sheet) 
+       Read the values from column 'C' and index the row of every package
+    """
+    global pkg_table
+    build_pkg_row_index(xl_session.ws)
+    for pkg, rows in duplicate_pkgs.items(): # warned here only, the index is also rebuilt by cleanup_xl_sheet()
+        logger.warning(f'WARNING: pkg {pkg} is listed in more than one row: {rows}')
+        print(f'WARNING: pkg {pkg} is listed in more than one row: {rows}')
+    pkg_list.clear()
+    pkg_list.extend(pkg_row_index.keys()) # duplicate rows are processed once and updated together
+    # From here on the stages read & write the package table, the session writes it back into the workbook
+    pkg_table = PackageTable.from_worksheet(xl_session.ws, pkg_row_index, pkg_table_cols)
+    xl_session.table = pkg_table
 
     logger.info(pkg_list)
 
@@ -145,21 +728,260 @@ def updatexl_pkg_col_value(pkg, col, val, color=white_color):
         col (_int_): _ column number _
         val (_any_): _ value _
     """
-    # Load the workbook
-    wb = openpyxl.load_workbook(workbook)  
-    # Access the worksheet (assuming it's the first sheet) 
-    ws = wb.active
-    for r in ws.iter_rows(min_row=3, values_only=True):
-        if r[2] != None:
-            if r[2].strip(' \t\n\r') == pkg:
-                ws.cell(row=r[1]+2, column=col).value = val
-                if color!=white_color:
-                    ws.cell(row=r[1]+2, column=col).fill = PatternFill("solid", fgColor=color)
-                elif color==white_color and val == "Not_Found":
-                    ws.cell(row=r[1]+2, column=col).fill = PatternFill("solid", fgColor=orange_color)
-                elif color==white_color:
-                    ws.cell(row=r[1]+2, column=col).fill = PatternFill("solid", fgColor=white_color)
-    wb.save(workbook)    
+    if pkg not in pkg_table.pos:
+        return
+    if color!=white_color:
+        fill_color = color
+    elif val == "Not_Found":
+        fill_color = orange_color
+    else:
+        fill_color = white_color
+    # Only the package table is updated here, the session exports it into the workbook on flush
+    pkg_table.set(pkg, col, val, fill_color)
+    xl_session.mark_dirty()
+    if stage_writes != None:
+        stage_writes.setdefault(pkg, []).append([col, val, fill_color])
+
+
+def load_incremental_state():
+    """Loads the fingerprints & outputs of the per pkg stages stored by the last incremental run
+    """
+    global incremental_state
+    incremental_state = {}
+    state_file = os.path.join(cache_dir, 'incremental-state.json')
+    if not os.path.exists(state_file):
+        return
+    try:
+        with open(state_file, 'r', encoding='utf8') as f:
+            incremental_state = json.load(f)
+    except Exception as e:
+        logger.exception(f'Error loading incremental state {state_file}: {e}')
+        incremental_state = {}
+
+
+def save_incremental_state():
+    global incremental_state_dirty
+    if incremental_state == None or not incremental_state_dirty:
+        return
+    os.makedirs(cache_dir, exist_ok=True)
+    with open(os.path.join(cache_dir, 'incremental-state.json'), 'w', encoding='utf8') as f:
+        json.dump(incremental_state, f, default=str)
+    incremental_state_dirty = False
+    logger.info(f'incremental state saved: {", ".join(f"{stage} {len(pkgs)} pkgs" for stage, pkgs in incremental_state.items())}')
+
+
+def run_pkg_stage(stage, update_func, get_fingerprints):
+    """Runs a per pkg stage on pkg_list, in chunks of run_journal_chunk pkgs whose results are journaled once done
+       the pkgs already done by an interrupted run (--resume) are skipped, their results were replayed by start_run_journal().
+       In incremental mode only the pkgs whose input fingerprint changed since the last incremental run are re-evaluated,
+       the cells the stage wrote for the other pkgs in that run are written again as they were
+
+    Args:
+        stage (string): stage name
+        update_func (Callable): runs the stage on a list of pkgs
+        get_fingerprints (Callable): pkg list -> {pkg: fingerprint of the stage inputs}, a pkg without one is always re-evaluated
+    """
+    global stage_writes, stage_failed, incremental_state_dirty
+    resumed = run_journal_done.get(stage, {})
+    pkgs = [pkg for pkg in pkg_list if pkg not in resumed]
+    if len(resumed) > 0:
+        msg = f'{stage}: {len(pkg_list) - len(pkgs)} pkgs resumed from the journal of the interrupted run'
+        logger.info(msg)
+        print(msg)
+    fingerprints = {}
+    changed = pkgs
+    if incremental_mode:
+        if incremental_state == None:
+            load_incremental_state()
+        stored = incremental_state.setdefault(stage, {})
+        for pkg, record in resumed.items():
+            if record['fp'] != None:
+                stored[pkg] = {'fp': record['fp'], 'writes': record['writes']}
+                incremental_state_dirty = True
+        fingerprints = get_fingerprints(pkgs)
+        changed = []
+        for pkg in pkgs:
+            entry = stored.get(pkg)
+            if entry != None and pkg in fingerprints and entry['fp'] == fingerprints[pkg]:
+                for col, val, color in entry['writes']:
+                    updatexl_pkg_col_value(pkg, col, val, color)
+            else:
+                changed.append(pkg)
+        msg = f'{stage}: {len(changed)} pkgs re-evaluated, {len(pkgs) - len(changed)} unchanged since the last incremental run'
+        logger.info(msg)
+        print(msg)
+
+    for start in range(0, len(changed), max(run_journal_chunk, 1)):
+        chunk = changed[start:start + max(run_journal_chunk, 1)]
+        stage_writes = {}
+        stage_failed = set()
+        try:
+            update_func(chunk)
+            writes = stage_writes
+            failed = stage_failed
+        finally:
+            stage_writes = None
+            stage_failed = None
+        # the pkgs whose lookups failed are evaluated again by a resumed run or the next incremental run
+        append_run_journal(stage, [pkg for pkg in chunk if pkg not in failed], writes, fingerprints)
+        if incremental_mode:
+            for pkg in chunk:
+                if pkg in fingerprints and pkg not in failed:
+                    stored[pkg] = {'fp': fingerprints[pkg], 'writes': writes.get(pkg, [])}
+                else:
+                    stored.pop(pkg, None)
+            incremental_state_dirty = True
+
+
+def mark_stage_failed(pkg):
+    """Flags a pkg of the stage chunk being run whose lookup failed, its results are not kept by run_pkg_stage()
+    """
+    if stage_failed != None:
+        stage_failed.add(pkg)
+
+
+def get_file_stat(path):
+    """[mtime in ns, size in bytes] of a file, None if it does not exist
+    """
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return [stat.st_mtime_ns, stat.st_size]
+
+
+def get_run_journal_header():
+    """Inputs of the run, a journal is only resumed by a run on the same unchanged inputs
+       the workbook is saved by the run itself, its mtime & size are journaled after every save instead
+    """
+    return {'workbook': os.path.abspath(workbook), 'build_state': os.path.abspath(build_state),
+            'build_state_stat': get_file_stat(build_state),
+            'code_dir_2_0': os.path.abspath(code_dir_2_0), 'code_dir_3_0': os.path.abspath(code_dir_3_0)}
+
+
+def load_run_journal(journal_path, header, workbook_stat):
+    """Reads the journal of an interrupted run, a torn last record left by the crash is dropped
+
+    Args:
+        journal_path (string): journal path
+        header (dict): get_run_journal_header() of this run
+        workbook_stat (list): get_file_stat() of the workbook before this run saved it
+
+    Returns:
+        tuple: (records, size in bytes of the complete records), records is None if the journal belongs to
+               other inputs or the inputs changed since the interrupted run
+    """
+    records = []
+    size = 0
+    saved_stat = None
+    with open(journal_path, 'rb') as f:
+        for i, line in enumerate(f):
+            if not line.endswith(b'\n'):
+                break
+            try:
+                record = json.loads(line)
+            except ValueError:
+                break
+            if i == 0:
+                if record.get('run') != header:
+                    logger.info(f'run journal {journal_path} is for other inputs or build_state changed since')
+                    return None, 0
+            elif 'workbook' in record: # the interrupted run saved the workbook
+                saved_stat = record['workbook']
+            else:
+                records.append(record)
+            size += len(line)
+    if size == 0:
+        return None, 0
+    if saved_stat != workbook_stat:
+        logger.info(f'run journal {journal_path}: the workbook changed since the interrupted run last saved it')
+        return None, 0
+    return records, size
+
+
+def start_run_journal():
+    """Starts the write-ahead journal of the (stage, pkg) results of the run in cache_dir
+       on --resume the journal of the interrupted run on the same inputs is continued, its results
+       are replayed into the package table at once so the workbook gets them with the next save
+    """
+    global run_journal
+    journal_path = os.path.join(cache_dir, 'run-journal.jsonl')
+    header = get_run_journal_header()
+    run_journal_done.clear()
+    records = None
+    if resume_mode and os.path.exists(journal_path):
+        try:
+            records, size = load_run_journal(journal_path, header, xl_session.opened_stat)
+        except OSError as e:
+            logger.exception(f'Error reading run journal {journal_path}: {e}')
+    if records == None:
+        if resume_mode:
+            msg = 'Nothing to resume, no journal of an interrupted run on these unchanged inputs'
+            logger.info(msg)
+            print(msg)
+        os.makedirs(cache_dir, exist_ok=True)
+        run_journal = open(journal_path, 'w', encoding='utf8')
+        run_journal.write(json.dumps({'run': header}) + '\n')
+        journal_workbook_stat(workbook)
+        return
+
+    with open(journal_path, 'r+b') as f:
+        f.truncate(size)
+    run_journal = open(journal_path, 'a', encoding='utf8')
+    journal_workbook_stat(workbook) # the cleanup of this run may have saved the workbook already
+    count = 0
+    for record in records:
+        run_journal_done.setdefault(record['stage'], {})[record['pkg']] = record
+        if record['pkg'] not in pkg_table.pos:
+            continue
+        for col, val, color in record['writes']:
+            pkg_table.set(record['pkg'], col, val, color)
+            count += 1
+    xl_session.mark_dirty(count)
+    msg = f'Resuming: {len(records)} (stage, pkg) results replayed from the journal, {count} cells'
+    logger.info(msg)
+    print(msg)
+
+
+def append_run_journal(stage, pkgs, writes, fingerprints):
+    """Journals the results of a finished stage chunk, synced to disk before the next chunk starts
+
+    Args:
+        stage (string): stage name
+        pkgs (list): pkgs of the chunk
+        writes (dict): pkg -> cells the stage wrote for it
+        fingerprints (dict): pkg -> input fingerprint, in incremental mode
+    """
+    if run_journal == None:
+        return
+    for pkg in pkgs:
+        run_journal.write(json.dumps({'stage': stage, 'pkg': pkg, 'fp': fingerprints.get(pkg), 'writes': writes.get(pkg, [])}, default=str) + '\n')
+    run_journal.flush()
+    os.fsync(run_journal.fileno())
+
+
+def journal_workbook_stat(path):
+    """Journals the mtime & size of the workbook as this run saved it, a resumed run expects to find it unchanged
+    """
+    if run_journal == None:
+        return
+    run_journal.write(json.dumps({'workbook': get_file_stat(path)}) + '\n')
+    run_journal.flush()
+    os.fsync(run_journal.fileno())
+
+
+def close_run_journal(completed):
+    """Closes the journal, it is deleted once the run completed and the workbook is saved
+       else it is kept for --resume
+    """
+    global run_journal
+    if run_journal == None:
+        return
+    journal_path = run_journal.name
+    run_journal.close()
+    run_journal = None
+    if completed:
+        os.remove(journal_path)
         
 
 def is_fedora_greater(fedora_ver, ver_3_0):
@@ -194,22 +1016,105 @@ def is_fedora_greater(fedora_ver, ver_3_0):
         print(f"Error comparing versions: {e} , fedora_ver: {fedora_ver}, ver_3_0: {ver_3_0}")
     return result
 
-def parse_version(version):
-    # Replace special cases
-    version = version.replace('Not_Found', '0').replace('Not_found', '0').replace('_', '.')
-    
-    # Split the version into components
-    # This regex captures numbers, letters, and special characters
-    components = re.split(r'(\d+|[a-zA-Z]+|[^0-9a-zA-Z]+)', version)
-    # Filter out empty strings and return a list of components
-    return [comp for comp in components if comp]
+# segment ranks of RpmVersionKey, the order rpmvercmp() gives them
+RPM_TILDE = 0 # '~' sorts before everything, even the end of the version: 1.0~rc1 < 1.0
+RPM_END = 1
+RPM_CARET = 2 # '^' sorts after the end of the version but before any other segment: 1.0 < 1.0^git1 < 1.0.1
+RPM_ALPHA = 3
+RPM_NUM = 4 # numeric segments are newer than alpha ones
+
+
+class RpmVersionKey(tuple):
+    """Sort key of an rpm '[epoch:]version[-release]' string, keys compare like rpm's rpmvercmp()
+       (epoch, version, release) tuple, version & release are flat (rank, value, rank, value, ...) tuples ending with RPM_END
+       so keys are compared and hashed as plain tuples, without a python call per comparison.
+       A key without release sorts before the same version with one
+    """
+    __slots__ = ()
+
+    @property
+    def epoch(self):
+        return self[0]
+
+    @property
+    def version(self):
+        return self[1]
+
+    @property
+    def release(self):
+        return self[2]
+
+    def __repr__(self):
+        return f'RpmVersionKey(epoch={self[0]}, version={self[1]}, release={self[2]})'
+
+
+def get_rpm_segments(text):
+    """Flat (rank, value, ...) tuple of the rpmvercmp segments of a version or release
+    """
+    segments = []
+    for token in rpm_version_token_pattern.findall(text):
+        if token == '~':
+            segments += (RPM_TILDE, 0)
+        elif token == '^':
+            segments += (RPM_CARET, 0)
+        elif token[0].isdigit():
+            segments += (RPM_NUM, int(token))
+        else:
+            segments += (RPM_ALPHA, token)
+    segments += (RPM_END, 0)
+    return tuple(segments)
+
+
+@lru_cache(maxsize=65536)
+def parse_rpm_version(text):
+    """Parses an rpm version string once, the keys of the last 64k distinct strings are kept
+
+    Args:
+        text (string): '[epoch:]version[-release]', ex. '5.2.15', '1:2.0~rc1-3.fc41'
+
+    Returns:
+        RpmVersionKey: key
+    """
+    epoch = 0
+    version = text
+    release = ()
+    epoch_str, sep, rest = version.partition(':')
+    if sep and epoch_str.isdigit():
+        epoch = int(epoch_str)
+        version = rest
+    if '-' in version:
+        version, release_str = version.rsplit('-', 1)
+        release = get_rpm_segments(release_str)
+    return RpmVersionKey((epoch, get_rpm_segments(version), release))
+
 
 def is_fedora_version_greater(ver_3_0, fedora_ver):
-    # print(f'ver_3_0 : {ver_3_0} , fedora_ver : {fedora_ver}')
-    # ver_3_0 = str(ver_3_0)
-    # fedora_ver = str(fedora_ver)
-    parsed_v1 = parse_version(ver_3_0)
-    parsed_v2 = parse_version(fedora_ver)
+    """ Compares the Azurelinux 3.0 and fedora version strings like rpm does
+
+    Returns:
+        bool: True if fedora_ver is greater
+    """
+    return parse_rpm_version(str(ver_3_0)) < parse_rpm_version(str(fedora_ver))
+
+
+def parse_version_legacy(v):
+    """ Version split used before parse_rpm_version(), kept for bench_version_compare()
+    """
+    # Replace invalid characters with dots for splitting
+    cleaned = re.sub(r'[^0-9a-zA-Z]', '.', v)
+    return [int(x) if x.isdigit() else x for x in cleaned.split('.')]
+
+
+def is_parsed_version_greater_legacy(parsed_v1, parsed_v2):
+    """ Version comparison used before parse_rpm_version(), kept for bench_version_compare()
+
+    Args:
+        parsed_v1 (list): parsed Azurelinux 3.0 version
+        parsed_v2 (list): parsed fedora version
+
+    Returns:
+        bool: True if parsed_v2 is greater
+    """
     # print(f'ver_3_0 parsed : {parsed_v1} , fedora_ver parsed: {parsed_v2}')
     # Compare the parsed components
     for comp1, comp2 in zip(parsed_v1, parsed_v2):
@@ -234,69 +1139,155 @@ def is_fedora_version_greater(ver_3_0, fedora_ver):
     
     return False  # They are equal
 
+
+def bench_version_compare(versions_file=None, count=5000, rounds=5):
+    """Micro-benchmark of parse_rpm_version() against the legacy version split & compare,
+       sorts the versions (like a kojipkgs listing) and compares them in pairs (like decide_need_upgrade())
+
+    Args:
+        versions_file (string): file with one version per line, None = count generated versions
+        count (int): generated versions
+        rounds (int): times every benchmark is run
+    """
+    if versions_file:
+        with open(versions_file, 'r', encoding='utf8') as f:
+            versions = [line.strip() for line in f if line.strip()]
+    else:
+        rng = random.Random(41)
+        suffixes = ['', '', '', 'a', '~rc1', '^20240101git1a2b3c', '.post1', 'p2']
+        versions = [f'{rng.randint(0, 30)}.{rng.randint(0, 99)}.{rng.randint(0, 20)}{rng.choice(suffixes)}' for _ in range(count)]
+    pairs = list(zip(versions, reversed(versions)))
+    print(f'{len(versions)} versions, {len(pairs)} pairs, {rounds} rounds')
+
+    def legacy_sort():
+        try:
+            return sorted(versions, key=parse_version_legacy, reverse=True)
+        except TypeError: # int vs str segment
+            return None
+
+    def legacy_compare():
+        return [is_parsed_version_greater_legacy(parse_version_legacy(a), parse_version_legacy(b)) for a, b in pairs]
+
+    def rpm_sort():
+        return sorted(versions, key=parse_rpm_version, reverse=True)
+
+    def rpm_compare():
+        return [parse_rpm_version(a) < parse_rpm_version(b) for a, b in pairs]
+
+    def rpm_compare_cold():
+        parse_rpm_version.cache_clear()
+        return rpm_compare()
+
+    results = {}
+    for name, func in [('legacy sort', legacy_sort), ('rpm sort', rpm_sort), ('legacy compare', legacy_compare),
+                       ('rpm compare cold', rpm_compare_cold), ('rpm compare', rpm_compare)]:
+        start = time.perf_counter()
+        for _ in range(rounds):
+            output = func()
+        results[name] = (time.perf_counter() - start) / rounds, output
+
+    for name, (elapsed, output) in results.items():
+        base = results['legacy sort' if 'sort' in name else 'legacy compare'][0]
+        print(f'{name:>17}: {elapsed * 1000:8.2f} ms  {base / elapsed:6.1f}x vs legacy')
+    if results['legacy sort'][1] == None:
+        print('legacy sort failed: a version mixes numeric and alpha segments at the same position')
+    differ = sum(a != b for a, b in zip(results['legacy compare'][1], results['rpm compare'][1]))
+    print(f'{differ} of {len(pairs)} comparisons differ from legacy (tilde, caret and alpha segments are ordered like rpm now)')
+    print(parse_rpm_version.cache_info())
+
+
+def decide_need_upgrade(fedora_vers, vers_3_0, build_statuses):
+    """ Decision engine for the "Need Upgrade" and "Upgrade to version" columns
+        Works on whole columns in one pass, every distinct version string is parsed only once
+
+    Args:
+        fedora_vers (list): col 'Q' values
+        vers_3_0 (list): col 'P' values
+        build_statuses (list): col 'M' values
+
+    Returns:
+        tuple: need_upgrade (Y/N/Revisit) list, upgrade_to_ver (Version/NA/Revisit) list
+    """
+    fedora = np.array(fedora_vers, dtype=object)
+    ver_3_0 = np.array(vers_3_0, dtype=object)
+    build = np.array(build_statuses, dtype=object)
+    missing_values = [None, 'Not_Found']
+    missing = np.isin(fedora, missing_values) | np.isin(ver_3_0, missing_values) | np.isin(build, missing_values)
+    equal = ~missing & (fedora == ver_3_0)
+
+    # parse every distinct version once, then compare the pre-parsed keys
+    to_compare = ~missing & ~equal
+    keys = {v: parse_rpm_version(str(v)) for v in set(fedora[to_compare]) | set(ver_3_0[to_compare])}
+    greater = np.zeros(len(fedora), dtype=bool)
+    for i in np.flatnonzero(to_compare):
+        greater[i] = keys[ver_3_0[i]] < keys[fedora[i]]
+
+    # else: Dont expect it to ever reach Revisit for found versions
+    need_upgrade = np.select([missing, equal, greater], ['Revisit', 'N', 'Y'], default='Revisit')
+    upgrade_to_ver = np.select([missing, equal, greater], ['Revisit', 'NA', fedora], default='Revisit')
+    return need_upgrade.tolist(), upgrade_to_ver.tolist()
+
+
+def decide_pkg_status(build_statuses, need_upgrades):
+    """ Decision engine for the "Status" column, works on whole columns in one pass
+        Only a built pkg which needs no upgrade is 'NA-Uptodate', everything else is 'Not_Started'
+
+    Args:
+        build_statuses (list): col 'M' values
+        need_upgrades (list): col 'D' values
+
+    Returns:
+        list: status list
+    """
+    build = np.array(build_statuses, dtype=object)
+    need_upgrade = np.array(need_upgrades, dtype=object)
+    uptodate = (build == 'Y') & (need_upgrade == 'N')
+    return np.where(uptodate, 'NA-Uptodate', 'Not_Started').tolist()
+
+
+def updatexl_col_values(col, values, colors):
+    """ Update a whole column of the package table, values & colors are in pkg_table order
+
+    Args:
+        col (int): column number
+        values (list): values
+        colors (list): fill colors
+    """
+    for i, (val, color) in enumerate(zip(values, colors)):
+        if color==white_color and val == "Not_Found":
+            color = orange_color
+        pkg_table.values[col][i] = val
+        pkg_table.colors[col][i] = color
+        pkg_table.dirty[col][i] = True
+    xl_session.mark_dirty(len(values))
+
+
 def update_if_need_upgrade():
     """ Based on the values fedora version, Azure 3.0 version and build status 
         update the status column if an update is required or not
     """
-
-    # Load the workbook
-    wb = openpyxl.load_workbook(workbook)  
-    # Access the worksheet (assuming it's the first sheet) 
-    ws = wb.active
-    for pkg in pkg_list:
-        need_upgrade = ''
-        fedora_ver = ''    
-        for r in ws.iter_rows(min_row=3, values_only=True):
-            if r[2] != None:
-                if r[2].strip(' \t\n\r') == pkg: #Skip row 0 & 1 , pkg info starts from row 2
-                    fedora_ver = ws.cell(row=r[1]+2, column=17).value # col 'Q'
-                    # print(f'fedora_ver type = {type(fedora_ver)}')
-                    ver_3_0 = ws.cell(row=r[1]+2, column=16).value # col 'P'
-
-                    build_status = ws.cell(row=r[1]+2, column=13).value # col 'M'
-                    need_upgrade = ''
-                    upgrade_to_ver = ''
-                    logger.info(f'fedora = {fedora_ver} : Azure3.0 = {ver_3_0}')
-                    if fedora_ver == 'Not_Found' or fedora_ver == None or ver_3_0 == None or ver_3_0 == 'Not_Found' or build_status == 'Not_Found' or build_status == None:
-                        need_upgrade = 'Revisit' 
-                        upgrade_to_ver = 'Revisit' 
-                    elif fedora_ver == ver_3_0:
-                        logger.info(f"{pkg}:Upgrade NOT Needed")
-                        need_upgrade = 'N'
-                        upgrade_to_ver = 'NA'
-                    # elif is_fedora_greater(fedora_ver, ver_3_0) : 
-                    elif is_fedora_version_greater(ver_3_0, fedora_ver):
-                        logger.info(f"{pkg}:Upgrade Needed")
-                        need_upgrade = 'Y'
-                        upgrade_to_ver = fedora_ver
-
-                    # elif build_status == 'Not_Found':
-                    #     need_upgrade = 'Revisit'
-                    #     upgrade_to_ver = 'Revisit'
-                    else: # Dont expect it to ever reach here
-                        need_upgrade = 'Revisit'
-                        upgrade_to_ver = 'Revisit'                                    
-
-                    logger.info(f'pkg = {pkg} , need_upgrade = {need_upgrade}, fedora_ver = {fedora_ver}')
-                    if need_upgrade == 'Y' or need_upgrade == 'N':
-                        updatexl_pkg_col_value(pkg, 4, need_upgrade) # col 'D'
-                        updatexl_pkg_col_value(pkg, 5, upgrade_to_ver) # col 'E'
-                    else:
-                        updatexl_pkg_col_value(pkg, 4, need_upgrade, revisit_color) # col 'D' , lets color code revisit
-                        updatexl_pkg_col_value(pkg, 5, upgrade_to_ver, revisit_color) # col 'E'
+    need_upgrade, upgrade_to_ver = decide_need_upgrade(pkg_table.column(17), pkg_table.column(16), pkg_table.column(13)) # col 'Q', 'P', 'M'
+    # lets color code revisit
+    colors = [white_color if need == 'Y' or need == 'N' else revisit_color for need in need_upgrade]
+    for pkg, need, to_ver in zip(pkg_table.pkgs, need_upgrade, upgrade_to_ver):
+        logger.info(f'pkg = {pkg} , need_upgrade = {need}, upgrade_to_ver = {to_ver}')
+    updatexl_col_values(4, need_upgrade, colors) # col 'D'
+    updatexl_col_values(5, upgrade_to_ver, colors) # col 'E'
 
 
 # update col 'M' and 'N' with build_state & Date 
-def updatexl_build_status_and_date(pkg, pkg_state):
+def updatexl_build_status_and_date(pkg, pkg_state, date=None):
     """_summary_
 
     Args:
         pkg (_type_): _description_
         pkg_state (_type_): _description_
+        date (string): build status date, defaults to the build_state.csv modified date
     """
 
-    timestamp = os.path.getmtime(build_state)
-    date = datetime.fromtimestamp(timestamp).strftime('%m-%d-%Y')
+    if date == None:
+        timestamp = os.path.getmtime(build_state)
+        date = datetime.fromtimestamp(timestamp).strftime('%m-%d-%Y')
     
     if pkg_state == 'Built':
         pkg_state = 'Y'
@@ -312,42 +1303,556 @@ def updatexl_build_status_and_date(pkg, pkg_state):
 
 
 # 
-def updatexl_fedora_src_link(pkg, version, release):
-    """ update col 'R' with Fedora Sources Link 
+def get_host_semaphore(host):
+    """Returns the semaphore capping the requests in flight to a host
 
     Args:
-        pkg (_type_): _description_
-        version (_type_): _description_
-        release (_type_): _description_
+        host (string): host name
+
+    Returns:
+        threading.BoundedSemaphore: semaphore
     """
-    logger.info(f'pkg = {pkg} , version = {version}')
-    url = f'https://kojipkgs.fedoraproject.org//packages/{pkg}/{version}/{release}/src/{pkg}-{version}-{release}.src.rpm'
-    response = requests.get(url)
-    if response.status_code == 200:
-        logger.info('src rpm url exists')
+    with http_host_semaphores_lock:
+        semaphore = http_host_semaphores.get(host)
+        if semaphore == None:
+            semaphore = threading.BoundedSemaphore(http_host_limits.get(host, http_max_per_host))
+            http_host_semaphores[host] = semaphore
+        return semaphore
+
+
+class HostUnavailableError(requests.ConnectionError):
+    """Raised without sending the request while the circuit breaker of a host is open
+    """
+
+
+class SourceUnavailableError(requests.RequestException):
+    """Raised when a fedora source as a whole cannot answer: an error status or an answer that cannot be parsed,
+       the failover loops move on to the next source
+    """
+
+
+class HostController:
+    """Adaptive concurrency and circuit breaker of a host, shared by http_get() and the asyncio fetch engine
+       AIMD: the requests allowed in flight grow by one per round of successful answers and are halved on a 429, a 503,
+       a failed request or an answer slower than http_slow_seconds, between 1 and max_limit.
+       A Retry-After holds every request to the host until it expires.
+       After http_breaker_failures failures in a row the breaker opens, requests fail at once with HostUnavailableError
+       for http_breaker_cooldown seconds, then one probe request is let through and its answer closes or reopens the breaker
+    """
+
+    def __init__(self, host, max_limit):
+        self.host = host
+        self.max_limit = max_limit
+        self.limit = float(max_limit)
+        self.in_flight = 0
+        self.hold_until = 0.0 # Retry-After
+        self.failures = 0 # in a row
+        self.open_until = None # None = breaker closed
+        self.probing = False
+        self.last_decrease = 0.0
+        self.latency = None # moving average, in seconds
+        self.requests = 0
+        self.errors = 0
+        self.breaker_opened = 0
+        self.cond = threading.Condition()
+
+    def try_acquire(self):
+        """Counts a request in flight if it can be sent now
+
+        Returns:
+            float: 0 if the request can be sent, else the seconds to wait before trying again
+        """
+        with self.cond:
+            now = time.time()
+            if self.open_until != None:
+                if now < self.open_until or self.probing:
+                    raise HostUnavailableError(f'{self.host} is down, circuit breaker open')
+                self.probing = True # half open, this request is the probe
+                self.in_flight += 1
+                return 0
+            if now < self.hold_until:
+                return self.hold_until - now
+            if self.in_flight >= int(self.limit):
+                return 0.05
+            self.in_flight += 1
+            return 0
+
+    def acquire(self):
+        """Waits until a request can be sent to the host, raises HostUnavailableError while the breaker is open
+        """
+        while True:
+            wait = self.try_acquire()
+            if wait == 0:
+                return
+            with self.cond:
+                self.cond.wait(wait)
+
+    async def acquire_async(self):
+        while True:
+            wait = self.try_acquire()
+            if wait == 0:
+                return
+            await asyncio.sleep(wait)
+
+    def release(self, latency, status_code=None, retry_after=None):
+        """Records the answer of a request counted in flight
+
+        Args:
+            latency (float): seconds the request took
+            status_code (int): http status code, None if the request raised (connection error, timeout, broken body, ...)
+            retry_after (float): Retry-After of the answer in seconds, None if there is none
+        """
+        with self.cond:
+            now = time.time()
+            self.in_flight -= 1
+            self.requests += 1
+            self.latency = latency if self.latency == None else 0.8 * self.latency + 0.2 * latency
+            if retry_after != None:
+                self.hold_until = max(self.hold_until, now + min(retry_after, http_retry_after_max))
+            if status_code == None or status_code >= 500:
+                self.errors += 1
+                self.failures += 1
+                if self.probing or self.failures >= http_breaker_failures:
+                    if self.open_until == None:
+                        self.breaker_opened += 1
+                        logger.error(f'{self.host}: {self.failures} failures in a row, circuit breaker open for {http_breaker_cooldown}s')
+                    self.open_until = now + http_breaker_cooldown
+                    self.probing = False
+            else:
+                self.failures = 0
+                if self.open_until != None:
+                    logger.info(f'{self.host}: probe answered, circuit breaker closed')
+                self.open_until = None
+                self.probing = False
+            if status_code in (None, 429, 503) or latency > http_slow_seconds:
+                if now - self.last_decrease > self.latency: # once per round trip, the answers of one burst lower it once
+                    self.limit = max(1.0, min(self.limit, self.in_flight + 1) / 2)
+                    self.last_decrease = now
+                    logger.info(f'{self.host}: concurrency lowered to {int(self.limit)}')
+            elif self.in_flight + 1 >= int(self.limit): # only grows while the limit is what holds the requests back
+                self.limit = min(float(self.max_limit), self.limit + 1 / self.limit)
+            self.cond.notify_all()
+
+
+def get_host_controller(host):
+    """Returns the HostController of a host, created on first use
+    """
+    with http_host_controllers_lock:
+        controller = http_host_controllers.get(host)
+        if controller == None:
+            controller = HostController(host, http_host_limits.get(host, max(http_max_per_host, get_async_max_per_host())))
+            http_host_controllers[host] = controller
+        return controller
+
+
+def get_async_max_per_host():
+    """async_max_per_host, or http_max_per_host if it is not set
+    """
+    return http_max_per_host if async_max_per_host == None else async_max_per_host
+
+
+def get_retry_after(status_code, headers):
+    """Retry-After of a 429 / 503 answer in seconds, None if there is none
+    """
+    value = headers.get('Retry-After')
+    if status_code not in (429, 503) or value == None:
+        return None
+    try:
+        return max(float(value), 0)
+    except ValueError:
+        pass
+    try: # http date
+        return max(email.utils.parsedate_to_datetime(value).timestamp() - time.time(), 0)
+    except (TypeError, ValueError):
+        return None
+
+
+def get_http_session():
+    """Returns the requests.Session shared by all the network helpers, created on first use
+       the pool keeps up to http_max_per_host connections alive per host so they are reused instead of new TCP+TLS handshakes
+    """
+    global http_session
+    with http_session_lock:
+        if http_session == None:
+            pool_size = max([http_max_per_host] + list(http_host_limits.values()))
+            adapter = HTTPAdapter(pool_connections=20, pool_maxsize=pool_size)
+            http_session = requests.Session()
+            http_session.mount('https://', adapter)
+            http_session.mount('http://', adapter)
+        return http_session
+
+
+def get_retry_delay(attempt):
+    """Full jitter exponential backoff, so the retries of many workers do not hit a host at once
+    """
+    return random.uniform(0, http_backoff * 2 ** attempt)
+
+
+def load_http_cache():
+    """Loads the http cache index persisted by the previous runs
+    """
+    global http_cache
+    http_cache = {}
+    cache_file = os.path.join(cache_dir, 'http-cache.json')
+    if not os.path.exists(cache_file):
+        return
+    try:
+        with open(cache_file, 'r', encoding='utf8') as f:
+            http_cache = json.load(f)
+    except Exception as e:
+        logger.exception(f'Error loading http cache {cache_file}: {e}')
+        http_cache = {}
+
+
+def save_http_cache():
+    """Persists the http cache index for the next runs
+       the least recently used pages are evicted until the cached bodies fit in http_cache_max_bytes
+    """
+    global http_cache_dirty
+    if http_cache == None or not http_cache_dirty:
+        return
+    with http_cache_lock:
+        total = sum(entry['size'] for entry in http_cache.values())
+        evicted = 0
+        for url in sorted(http_cache, key=lambda url: http_cache[url]['accessed']):
+            if total <= http_cache_max_bytes:
+                break
+            entry = http_cache.pop(url)
+            total -= entry['size']
+            evicted += 1
+            if entry['body'] != None and os.path.exists(get_http_cache_body_path(entry['body'])):
+                os.remove(get_http_cache_body_path(entry['body']))
+        os.makedirs(cache_dir, exist_ok=True)
+        with open(os.path.join(cache_dir, 'http-cache.json'), 'w', encoding='utf8') as f:
+            json.dump(http_cache, f)
+        http_cache_dirty = False
+    logger.info(f'http cache saved: {len(http_cache)} pages, {total} bytes, {evicted} evicted')
+
+
+def get_http_cache_body_path(name):
+    return os.path.join(cache_dir, 'http-cache', name)
+
+
+def get_http_cache_entry(url, read_body=True):
+    """Returns the cached response of url, fresh or stale
+
+    Args:
+        url (string): url
+        read_body (bool): False when only the status code is needed, an entry without body is then good enough
+
+    Returns:
+        dict: cache entry, None if url is not cached
+    """
+    global http_cache_dirty
+    if not http_cache_enabled:
+        return None
+    with http_cache_lock:
+        if http_cache == None:
+            load_http_cache()
+        entry = http_cache.get(url)
+        if entry == None or (read_body and entry['body'] == None):
+            return None
+        entry['accessed'] = time.time()
+        http_cache_dirty = True
+        return entry
+
+
+def is_http_cache_fresh(entry):
+    return time.time() - entry['fetched'] < http_cache_ttl
+
+
+def get_revalidation_headers(entry):
+    """Conditional request headers of a stale cache entry, the server answers 304 if the page did not change
+    """
+    headers = {}
+    if entry['headers'].get('ETag') != None:
+        headers['If-None-Match'] = entry['headers']['ETag']
+    if entry['headers'].get('Last-Modified') != None:
+        headers['If-Modified-Since'] = entry['headers']['Last-Modified']
+    return headers
+
+
+def read_http_cache_body(entry):
+    if entry['body'] == None:
+        return b''
+    try:
+        with open(get_http_cache_body_path(entry['body']), 'rb') as f:
+            return f.read()
+    except OSError:
+        return b'' # body file lost, the next run refetches it since the entry was revalidated / stored again
+
+
+def refresh_http_cache_entry(url):
+    """The server answered 304 for a stale entry, it is fresh again
+    """
+    global http_cache_dirty
+    with http_cache_lock:
+        http_cache[url]['fetched'] = time.time()
+        http_cache_dirty = True
+
+
+def store_http_cache_entry(url, status_code, content, headers, read_body=True):
+    """Caches a fetched page, only 200 / 206 / 404 answers are cached
+
+    Args:
+        url (string): url
+        status_code (int): http status code
+        content (bytes): body
+        headers (dict like): response headers
+        read_body (bool): False if the body was not downloaded, only the status is cached
+    """
+    global http_cache_dirty
+    if not http_cache_enabled or status_code not in (200, 206, 404) or len(content) > http_cache_max_entry_bytes:
+        return
+    with http_cache_lock:
+        if http_cache == None:
+            load_http_cache()
+    body = None
+    if read_body:
+        body = hashlib.sha1(url.encode('utf8')).hexdigest()
+        os.makedirs(os.path.join(cache_dir, 'http-cache'), exist_ok=True)
+        tmp_path = f'{get_http_cache_body_path(body)}.{threading.get_ident()}.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(content)
+        os.replace(tmp_path, get_http_cache_body_path(body))
+    kept_headers = {name: headers.get(name) for name in ('Content-Type', 'Content-Length', 'Content-Range', 'ETag', 'Last-Modified')
+                    if headers.get(name) != None}
+    now = time.time()
+    with http_cache_lock:
+        http_cache[url] = {'status': status_code, 'headers': kept_headers, 'body': body, 'size': len(content),
+                           'fetched': now, 'accessed': now}
+        http_cache_dirty = True
+
+
+def make_http_response(url, status_code, content, headers):
+    """requests.Response built from a cached page, so the callers cannot tell it from a fetched one
+    """
+    response = requests.Response()
+    response.url = url
+    response.status_code = status_code
+    response.reason = 'Gateway Timeout (offline, not cached)' if status_code == 504 else 'OK (cached)'
+    response.headers = requests.structures.CaseInsensitiveDict(headers)
+    response.encoding = requests.utils.get_encoding_from_headers(response.headers)
+    response._content = content
+    return response
+
+
+def http_get(url, read_body=True, method='GET', **kwargs):
+    """ GET used by all the network helpers, at most http_max_per_host requests are sent to a host at once
+        requests time out after http_timeout and are retried up to http_retries times on a 429 / 5xx status, a connection reset or a timeout
+        pages are served from the http cache while fresh, revalidated with ETag / Last-Modified once stale,
+        with http_offline they are only replayed from the cache
+
+    Args:
+        url (string): url
+        read_body (bool): False when only the status code is needed, the body is not downloaded
+        method (string): 'HEAD' to only read the status code & headers
+
+    Returns:
+        requests.Response: response, the last one if every try got a 429 / 5xx status, a synthetic 504 if offline and not cached
+    """
+    entry = get_http_cache_entry(url, read_body)
+    if entry != None and (http_offline or is_http_cache_fresh(entry)):
+        return make_http_response(url, entry['status'], read_http_cache_body(entry), entry['headers'])
+    if http_offline:
+        logger.error(f'{url} is not in the http cache, offline')
+        return make_http_response(url, 504, b'', {})
+
+    if entry != None:
+        kwargs['headers'] = {**kwargs.get('headers', {}), **get_revalidation_headers(entry)}
+    if not read_body:
+        kwargs['stream'] = True
+    response = http_request(url, method=method, **kwargs)
+    if response.status_code == 304 and entry != None:
+        response.close()
+        refresh_http_cache_entry(url)
+        return make_http_response(url, entry['status'], read_http_cache_body(entry), entry['headers'])
+    if not read_body:
+        response.close()
+        response = make_http_response(url, response.status_code, b'', response.headers)
+    store_http_cache_entry(url, response.status_code, response.content, response.headers, read_body)
+    return response
+
+
+def http_request(url, method='GET', **kwargs):
+    """ requests.request() with http_timeout and the retries of http_get(), not cached
+        the HostController of the host paces the requests and raises HostUnavailableError at once while the host is down
+    """
+    kwargs.setdefault('timeout', http_timeout)
+    session = get_http_session()
+    host = urlparse(url).hostname
+    semaphore = get_host_semaphore(host)
+    controller = get_host_controller(host)
+    for attempt in range(http_retries + 1):
+        with semaphore:
+            controller.acquire()
+            started = time.time()
+            status_code = retry_after = None # None = failed, any exception counts as a failure of the host
+            try:
+                response = session.request(method, url, **kwargs)
+                status_code = response.status_code
+                retry_after = get_retry_after(response.status_code, response.headers)
+            except http_retry_exceptions as exception:
+                if attempt == http_retries:
+                    raise
+                logger.warning(f'{url} failed: {exception}, retry {attempt + 1} of {http_retries}')
+                response = None
+            finally:
+                controller.release(time.time() - started, status_code, retry_after)
+        if response != None:
+            if response.status_code not in http_retry_statuses or attempt == http_retries:
+                return response
+            logger.warning(f'{url} returned {response.status_code}, retry {attempt + 1} of {http_retries}')
+            response.close()
+        time.sleep(get_retry_delay(attempt))
+
+
+def log_http_conn_stats():
+    """Logs how many requests reused a kept alive connection and how many opened a new one
+    """
+    new_conns = async_conn_stats['new']
+    reused_conns = async_conn_stats['reused']
+    if http_session != None:
+        for adapter in set(http_session.adapters.values()):
+            pools = adapter.poolmanager.pools
+            for key in pools.keys():
+                pool = pools[key]
+                new_conns += pool.num_connections
+                reused_conns += max(pool.num_requests - pool.num_connections, 0)
+    if new_conns + reused_conns == 0:
+        return
+    msg = f'HTTP connections: {new_conns} new (TCP+TLS handshakes), {reused_conns} reused'
+    logger.info(msg)
+    print(msg)
+    for host, controller in http_host_controllers.items():
+        latency = f'{controller.latency:.2f}s' if controller.latency != None else '-'
+        logger.info(f'{host}: {controller.requests} requests, {controller.errors} errors, latency {latency}, '
+                    f'concurrency {int(controller.limit)}, circuit breaker opened {controller.breaker_opened} times')
+
+
+def get_fedora_src_rpm_url(pkg, version, release):
+    """ Returns the kojipkgs url of the src rpm of a fedora build
+    """
+    return f'https://kojipkgs.fedoraproject.org//packages/{pkg}/{version}/{release}/src/{pkg}-{version}-{release}.src.rpm'
+
+
+SrcLinkInfo = namedtuple('SrcLinkInfo', ['exists', 'size', 'last_modified']) # exists: True, False, or None when the link could not be verified
+
+
+def make_src_link_info(status_code, headers):
+    """SrcLinkInfo from the answer to a HEAD or a 0 byte ranged GET of a src rpm url
+
+    Args:
+        status_code (int): http status code
+        headers (dict like): response headers
+
+    Returns:
+        SrcLinkInfo: exists (None for a 429 / 5xx answer), size in bytes (None if unknown), last modified
+    """
+    size = None
+    content_range = headers.get('Content-Range')
+    if status_code == 206 and content_range != None and not content_range.endswith('/*'): # 'bytes 0-0/123456'
+        size = int(content_range.rsplit('/', 1)[1])
+    elif status_code == 200 and headers.get('Content-Length') != None:
+        size = int(headers.get('Content-Length'))
+    if status_code in http_retry_statuses: # the server failed to answer, it does not tell the src rpm is missing
+        return SrcLinkInfo(None, None, None)
+    return SrcLinkInfo(status_code in (200, 206), size, headers.get('Last-Modified'))
+
+
+def verify_src_link(url):
+    """Checks a src rpm url exists without downloading the rpm: HEAD, 
+       or a 0 byte ranged GET if the server does not allow HEAD. Urls are verified once per run
+
+    Args:
+        url (string): src rpm url
+
+    Returns:
+        SrcLinkInfo: exists (None if it could not be verified), size in bytes (None if unknown), last modified
+    """
+    with src_link_cache_lock:
+        link_info = src_link_cache.get(url)
+    if link_info != None:
+        return link_info
+    try:
+        response = http_get(url, read_body=False, method='HEAD')
+        if response.status_code in (405, 501): # HEAD not allowed
+            response = http_get(url, read_body=False, headers={'Range': 'bytes=0-0'})
+        link_info = make_src_link_info(response.status_code, response.headers)
+    except requests.RequestException as e: # host down, connection error, timeout, ... only this url is left unverified
+        logger.error(f'{url} not verified: {e!r}')
+        link_info = SrcLinkInfo(None, None, None)
+    if link_info.exists != None: # an unverified url is tried again by the next lookup
+        with src_link_cache_lock:
+            src_link_cache[url] = link_info
+    return link_info
+
+
+def verify_src_links(urls):
+    """Verifies many src rpm urls at once, with the asyncio fetch engine when aiohttp is installed 
+       or a pool of fedora_lookup_workers threads
+
+    Args:
+        urls (list): src rpm urls, duplicates are verified once
+
+    Returns:
+        dict: url -> SrcLinkInfo
+    """
+    urls = list(dict.fromkeys(urls))
+    if fedora_async_fetch and aiohttp != None:
+        link_infos = asyncio.run(verify_src_links_async(urls))
+    else:
+        with ThreadPoolExecutor(max_workers=max(fedora_lookup_workers, 1)) as executor:
+            link_infos = list(executor.map(verify_src_link, urls))
+    return dict(zip(urls, link_infos))
 
+
+def get_src_link_value(url, link_info):
+    """ Fedora Sources Link of a verified src rpm url
+
+    Args:
+        url (string): src rpm url
+        link_info (SrcLinkInfo): verify_src_link() result
+
+    Returns:
+        string: url, 'Not_Found' if the src rpm does not exist
+    """
+    if link_info.exists:
+        logger.info('src rpm url exists')
         # if cur_stable_fedora_rel not in release:
-        #     updatexl_pkg_col_value(pkg, 18, 'Not_Found') # col 'R'
-        # else:
-        #     updatexl_pkg_col_value(pkg, 18, url) # col 'R'
-        updatexl_pkg_col_value(pkg, 18, url) # col 'R'
+        #     url = 'Not_Found'
     else:
         logger.error(f'{url} does not exist')
         url = "Not_Found"
-        updatexl_pkg_col_value(pkg, 18, url) # col 'R'   
+    return url
+
+
+def get_src_link_details(link_info):
+    """ col 'V' text of a verified src rpm, ex. '23.4 MB, Wed, 01 May 2024 10:00:00 GMT'
+    """
+    if link_info.size == None:
+        size = 'size unknown'
+    elif link_info.size < 1024 * 1024:
+        size = f'{link_info.size / 1024:.1f} KB'
+    else:
+        size = f'{link_info.size / (1024 * 1024):.1f} MB'
+    if link_info.last_modified == None:
+        return size
+    return f'{size}, {link_info.last_modified}'
+
 
             
-def get_upstream_src(url):
-    """_summary_
+def get_upstream_src(url, source):
+    """Upstream link of a packages.fedoraproject.org pkg page
 
     Args:
-        url (_type_): _description_
+        url (string): pkg page url
+        source (string): html of the pkg page
 
     Returns:
-        _type_: _description_
+        string: upstream url, 'Not_Found' if there is none
     """
     result = "Not_Found"
-    source = requests.get(url).text
     soup = BeautifulSoup(source, 'lxml')
     try:
         li_tags = soup.find_all('li')
@@ -362,18 +1867,19 @@ def get_upstream_src(url):
     return result        
 
     
-def get_fedora_pkg_release_info(url):
-    """_summary_
+def get_fedora_pkg_release_info(url, source):
+    """Fedora 41 stable [version, release] from the releases table of a packages.fedoraproject.org pkg page
 
     Args:
-        url (_type_): _description_
+        url (string): pkg page url
+        source (string): html of the pkg page
 
     Returns:
-        _type_: _description_
+        list: [version, release], 'Not_Found' if there is no Fedora 41 release
     """
     release = "Not_Found"
     try:
-        html_page_table = pd.read_html(url, match="Fedora ")
+        html_page_table = pd.read_html(io.StringIO(source), match="Fedora ")
         df = html_page_table[0] # dataframe of table with all fedora releases and version details
         # print(df)
         for row in df.itertuples():
@@ -410,28 +1916,158 @@ def search_in_file(file_path, search_text):
     return  return_line
 
 
-def get_version_info_from_specfile(file_path):
-    """_summary_
+# Parsed spec file, 'Not_Found' is used for values with unresolved macros and the *_unresolved flag is set
+SpecRecord = namedtuple('SpecRecord', ['name', 'version', 'release', 'url', 'source0', 'version_unresolved', 'release_unresolved', 'url_unresolved'])
+
+
+def parse_spec_record(file_path):
+    """Parses a spec file once and resolves the macros of all the values used by this script
 
     Args:
-        file_path (_type_): _description_
+        file_path (string): spec file path
 
     Returns:
-        _type_: _description_
+        SpecRecord: parsed values
     """
     spec = Spec.from_file(file_path)
+    name = replace_macros(spec.name, spec)
+
+    version_unresolved = False
     if '%' in spec.version:
         version = replace_macros(spec.version, spec)
         if '%{nil}' in version:
             version = version.replace('%{nil}', "")
         if '%(echo' in version or ':Requirements' in version or '%' in version: # some pkg files have run linux commands to resolve macros at runtime perl-Crypt-PasswdMD5.spec, perl-Version-Requirements.spec
-            logger.error(f'ERROR: could not resolve pkg Version macro for  {spec.name}')
             version = 'Not_Found'
+            version_unresolved = True
     else:
         version = spec.version
+
+    release_unresolved = False
+    if '%' in spec.release:
+        release = replace_macros(spec.release, spec)
+        if '%' in release:
+            release = 'Not_Found'
+            release_unresolved = True
+    else:
+        release = spec.release
+
+    url = 'Not_Found'
+    url_unresolved = False
+    if spec.url != None:
+        if '%' in spec.url:
+            url = replace_macros(spec.url, spec)
+            if '%' in url: # handle unresolved macros
+                url = 'Not_Found'
+                url_unresolved = True
+        else:
+            url = spec.url
+
+    source0 = 'Not_Found'
+    if spec.sources:
+        source0 = replace_macros(spec.sources[0], spec)
+
+    return SpecRecord(name, version, release, url, source0, version_unresolved, release_unresolved, url_unresolved)
+
+
+def load_spec_parse_cache():
+    """Loads the spec parse cache persisted by the previous runs
+    """
+    global spec_parse_cache
+    spec_parse_cache = {}
+    cache_file = os.path.join(cache_dir, 'spec-parse-cache.json')
+    if not os.path.exists(cache_file):
+        return
+    try:
+        with open(cache_file, 'r', encoding='utf8') as f:
+            data = json.load(f)
+        spec_parse_cache = data['paths']
+        spec_records.update({sha1: SpecRecord(*record) for sha1, record in data['records'].items()})
+    except Exception as e:
+        logger.exception(f'Error loading spec parse cache {cache_file}: {e}')
+        spec_parse_cache = {}
+        spec_records.clear()
+
+
+def save_spec_parse_cache():
+    """Persists the spec parse cache for the next runs, only the records of the known spec paths are kept
+    """
+    global spec_parse_cache_dirty
+    if spec_parse_cache == None or not spec_parse_cache_dirty:
+        return
+    with spec_parse_cache_lock:
+        used = {entry['sha1'] for entry in spec_parse_cache.values()}
+        data = {'paths': spec_parse_cache,
+                'records': {sha1: list(record) for sha1, record in spec_records.items() if sha1 in used}}
+        os.makedirs(cache_dir, exist_ok=True)
+        with open(os.path.join(cache_dir, 'spec-parse-cache.json'), 'w', encoding='utf8') as f:
+            json.dump(data, f)
+        spec_parse_cache_dirty = False
+    logger.info(f'spec parse cache saved: {len(data["paths"])} spec files')
+
+
+def get_spec_hash(file_path):
+    """sha1 of a spec file, taken from the spec parse cache while the file's modified time & size are unchanged
+    """
+    with spec_parse_cache_lock:
+        if spec_parse_cache == None:
+            load_spec_parse_cache()
+        entry = spec_parse_cache.get(os.path.abspath(file_path))
+    stat = os.stat(file_path)
+    if entry != None and entry['mtime_ns'] == stat.st_mtime_ns and entry['size'] == stat.st_size:
+        return entry['sha1']
+    with open(file_path, 'rb') as f:
+        return hashlib.sha1(f.read()).hexdigest()
+
+
+def get_spec_record(file_path):
+    """Returns the parsed values of a spec file, the file is parsed only if it was never seen before
+       A spec is looked up by path + modified time & size, then by content hash, so an
+       unchanged spec is never parsed again even if it was re-cloned or is shared by the 2.0 & 3.0 trees
+
+    Args:
+        file_path (string): spec file path
+
+    Returns:
+        SpecRecord: parsed values
+    """
+    global spec_parse_cache_dirty
+    with spec_parse_cache_lock:
+        if spec_parse_cache == None:
+            load_spec_parse_cache()
+    key = os.path.abspath(file_path)
+    stat = os.stat(file_path)
+    entry = spec_parse_cache.get(key)
+    if entry != None and entry['mtime_ns'] == stat.st_mtime_ns and entry['size'] == stat.st_size and entry['sha1'] in spec_records:
+        return spec_records[entry['sha1']]
+
+    with open(file_path, 'rb') as f:
+        sha1 = hashlib.sha1(f.read()).hexdigest()
+    record = spec_records.get(sha1)
+    if record == None:
+        record = parse_spec_record(file_path)
+    with spec_parse_cache_lock:
+        spec_records[sha1] = record
+        spec_parse_cache[key] = {'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size, 'sha1': sha1}
+        spec_parse_cache_dirty = True
+    return record
+
+
+def get_version_info_from_specfile(file_path):
+    """_summary_
+
+    Args:
+        file_path (_type_): _description_
+
+    Returns:
+        _type_: _description_
+    """
+    record = get_spec_record(file_path)
+    if record.version_unresolved:
+        logger.error(f'ERROR: could not resolve pkg Version macro for  {record.name}')
         
-    print(f'{replace_macros(spec.name, spec)} version = {version}')
-    return version
+    print(f'{record.name} version = {record.version}')
+    return record.version
 
 def get_release_info_from_specfile(file_path):
     """_summary_
@@ -442,26 +2078,12 @@ def get_release_info_from_specfile(file_path):
     Returns:
         _type_: _description_
     """
-    spec = Spec.from_file(file_path)
-    if '%' in spec.release:
-        release = replace_macros(spec.release, spec)
-        if '%' in release:
-            logger.error(f'ERROR: could not resolve pkg Release macro for  {spec.name}')
-            release = 'Not_Found'
-    else:
-        release = spec.release
-
+    record = get_spec_record(file_path)
+    if record.release_unresolved:
+        logger.error(f'ERROR: could not resolve pkg Release macro for  {record.name}')
         
-    logger.info(f'{replace_macros(spec.name, spec)} release = {release}')
-    # rel_line = search_in_file(file_path, 'Release:')
-    # rel_line = rel_line.strip() #strip \n\r
-    # release = ''
-    # p = r'[\d]+[.,\d]+|[\d]*[.][\d]+|[\d]+' # some spec files used \t , so had to go this route to search numbers
-    # release = re.findall(p,  rel_line) # returns list of number string
-    # print(f'release from spec {release}')
-    # if release != []: # some specs have no release , eg. libtomath
-    #     release = release[0]
-    return release
+    logger.info(f'{record.name} release = {record.release}')
+    return record.release
 
 def find_file(filename, directory):
     """Finds a specific file in a directory and its subdirectories.
@@ -480,6 +2102,119 @@ def find_file(filename, directory):
     return None
 
 
+class SpecFileIndex:
+    """{spec file name -> path} index of a source tree, built with one walk of the tree
+       When a spec file name is found more than once the first one found by os.walk wins, same as find_file()
+    """
+
+    def __init__(self, directory, fingerprint=None, paths=None):
+        self.directory = directory
+        self.fingerprint = fingerprint
+        self.paths = paths if paths != None else {}
+        self.lock = threading.Lock()
+
+    def add_tree(self, directory):
+        """Indexes every spec file found under a directory
+        """
+        with self.lock:
+            for root, dirs, files in os.walk(directory):
+                for filename in files:
+                    if filename.endswith('.spec') and filename not in self.paths:
+                        self.paths[filename] = os.path.join(root, filename)
+
+    def find(self, filename):
+        """Returns the path of a spec file, None if it is not in the tree
+        """
+        return self.paths.get(filename)
+
+    def kind(self, filename):
+        """Returns 'SPECS-EXTENDED' or 'SPECS' for a spec file of the tree, '' otherwise
+        """
+        file_path = self.find(filename)
+        if file_path == None:
+            return ''
+        if "SPECS-EXTENDED" in file_path:
+            return 'SPECS-EXTENDED'
+        if "SPECS" in file_path:
+            return 'SPECS'
+        return ''
+
+    def save(self, cache_file):
+        os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+        with open(cache_file, 'w', encoding='utf8') as f:
+            json.dump({'directory': self.directory, 'fingerprint': self.fingerprint, 'paths': self.paths}, f)
+
+    @classmethod
+    def load(cls, cache_file):
+        with open(cache_file, 'r', encoding='utf8') as f:
+            data = json.load(f)
+        return cls(data['directory'], data['fingerprint'], data['paths'])
+
+
+def get_tree_fingerprint(directory):
+    """Fingerprint of a source tree used to invalidate its persisted spec index
+       Combines the git HEAD commit (if it is a git checkout) with the modified time of
+       SPECS, SPECS-EXTENDED and their package directories, adding/removing a spec changes these
+
+    Args:
+        directory (string): tree directory
+
+    Returns:
+        string: fingerprint
+    """
+    digest = hashlib.sha1()
+    try:
+        digest.update(git.Repo(directory).head.commit.hexsha.encode())
+    except Exception:
+        digest.update(b'no-git-head')
+    for specs_dir in ['SPECS', 'SPECS-EXTENDED']:
+        specs_path = os.path.join(directory, specs_dir)
+        if not os.path.isdir(specs_path):
+            continue
+        digest.update(f'{specs_dir}:{os.stat(specs_path).st_mtime_ns}'.encode())
+        with os.scandir(specs_path) as it:
+            for entry in sorted(it, key=lambda e: e.name):
+                if entry.is_dir():
+                    digest.update(f'{entry.name}:{entry.stat().st_mtime_ns}'.encode())
+    return digest.hexdigest()
+
+
+def get_spec_index(directory, persist=True):
+    """Returns the spec index of a source tree
+       A persisted index is reused as long as the tree fingerprint did not change, else the tree is walked once
+
+    Args:
+        directory (string): tree directory
+        persist (bool): load/save the index from/to cache_dir, False for trees that change during the run
+
+    Returns:
+        SpecFileIndex: index
+    """
+    with spec_indexes_lock:
+        index = spec_indexes.get(directory)
+        if index != None:
+            return index
+        fingerprint = get_tree_fingerprint(directory) if persist else None
+        cache_file = os.path.join(cache_dir, f'spec-index-{hashlib.sha1(os.path.abspath(directory).encode()).hexdigest()[:16]}.json')
+        if persist and os.path.exists(cache_file):
+            try:
+                index = SpecFileIndex.load(cache_file)
+                if index.fingerprint != fingerprint:
+                    logger.info(f'spec index of {directory} is stale, rebuilding')
+                    index = None
+            except Exception as e:
+                logger.exception(f'Error loading spec index {cache_file}: {e}')
+                index = None
+        if index == None:
+            index = SpecFileIndex(directory, fingerprint)
+            index.add_tree(directory)
+            logger.info(f'spec index of {directory} built: {len(index.paths)} spec files')
+            if persist:
+                index.save(cache_file)
+        spec_indexes[directory] = index
+        return index
+
+
 def get_pkg_ver(pkg, pkg_ver):
     """ For both 2.0 & 3.0 
         searches the package spec file in SPECS-EXTENDED and if not found searches for the same in SPEC dir
@@ -501,12 +2236,14 @@ def get_pkg_ver(pkg, pkg_ver):
     else:
         logger.error(f'ERROR: wrong {pkg_ver}')
         return None
-    file_path = find_file(filename, directory)
+    spec_index = get_spec_index(directory)
+    file_path = spec_index.find(filename)
     if file_path:
         logger.info(f"File found: {file_path}")
-        if "SPECS-EXTENDED" in file_path:
+        spec_kind = spec_index.kind(filename)
+        if spec_kind == 'SPECS-EXTENDED':
             pkg_ver_info = get_version_info_from_specfile(file_path)
-        elif "SPECS" in file_path:
+        elif spec_kind == 'SPECS':
             pkg_ver_info = get_version_info_from_specfile(file_path)
             pkg_ver_info = f"Moved_to_Core: {pkg} version {pkg_ver_info}"
     else:
@@ -536,42 +2273,233 @@ def get_fedora_pkg_info_from_pkg_url(pkg):
     Args:
         pkg (string): package name
 
+    Returns:
+        tuple: fedora_version, fedora_release_str, upstream_src
+    """
+    url = f'https://packages.fedoraproject.org/pkgs/{pkg}/{pkg}/'
+        #check if url exists
+    response = http_get(url)
+    return parse_fedora_pkg_page(pkg, url, response.status_code, response.text)
+
+
+async def get_fedora_pkg_info_from_pkg_url_async(fetcher, pkg):
+    """get_fedora_pkg_info_from_pkg_url() with the asyncio fetch engine
+    """
+    url = f'https://packages.fedoraproject.org/pkgs/{pkg}/{pkg}/'
+    status_code, content = await fetcher.get(url)
+    return parse_fedora_pkg_page(pkg, url, status_code, content.decode('utf8', errors='replace'))
+
+
+def parse_fedora_pkg_page(pkg, url, status_code, source):
+    """Release table and Upstream link of a packages.fedoraproject.org pkg page, both parsed from the one fetched body
+
+    Args:
+        pkg (string): package name
+        url (string): pkg page url
+        status_code (int): http status code of url
+        source (string): html of url
+
     Returns:
         tuple: fedora_version, fedora_release_str, upstream_src
     """
     fedora_version = 'Not_Found'
     fedora_release_str = 'Not_Found'
     upstream_src = 'Not_Found'
-    url = f'https://packages.fedoraproject.org/pkgs/{pkg}/{pkg}/'
-        #check if url exists
-    response = requests.get(url)
-    if response.status_code == 200:
+    if status_code == 200:
         logger.info(f'{url} exists')
         try:
-            release_info = get_fedora_pkg_release_info(url) 
+            release_info = get_fedora_pkg_release_info(url, source) 
             if release_info != 'Not_Found':
                 fedora_version = release_info[0]  # pkg version used by fedora
                 fedora_release_str = release_info[1]  # pkg release info specific to fedora  
             
-            upstream_src = get_upstream_src(url)  
+            upstream_src = get_upstream_src(url, source)  
         except:
             logger.error(f'url exist for pkg {pkg}, but could not be parsed')     
     else:
         logger.error(f'url does not exist for pkg {pkg}')
     return (fedora_version, fedora_release_str, upstream_src)
 
-def get_fedora_git_branch_name(git_url):
-    """_summary_
+def get_git_mirror_dir():
+    return git_mirror_dir if git_mirror_dir != '' else os.path.join(cache_dir, 'git-mirrors')
+
+
+def get_git_mirror_path(pkg):
+    return os.path.join(get_git_mirror_dir(), f'{pkg}.git')
+
+
+def load_git_mirrors():
+    """Loads the mirror index persisted by the previous runs, mirrors missing on disk are dropped
+    """
+    global git_mirrors
+    git_mirrors = {}
+    index_file = os.path.join(get_git_mirror_dir(), 'mirrors.json')
+    if not os.path.exists(index_file):
+        return
+    try:
+        with open(index_file, 'r', encoding='utf8') as f:
+            data = json.load(f)
+        git_mirrors = {pkg: entry for pkg, entry in data.items() if os.path.isdir(get_git_mirror_path(pkg))}
+    except Exception as e:
+        logger.exception(f'Error loading git mirror index {index_file}: {e}')
+        git_mirrors = {}
+
+
+def save_git_mirrors():
+    """Persists the mirror index for the next runs
+       the least recently used mirrors are pruned until they fit in git_mirror_max_bytes
+    """
+    global git_mirrors_dirty
+    if git_mirrors == None or not git_mirrors_dirty:
+        return
+    with git_mirrors_lock:
+        total = sum(entry['size'] for entry in git_mirrors.values())
+        pruned = 0
+        for pkg in sorted(git_mirrors, key=lambda pkg: git_mirrors[pkg]['accessed']):
+            if total <= git_mirror_max_bytes:
+                break
+            entry = git_mirrors.pop(pkg)
+            total -= entry['size']
+            pruned += 1
+            shutil.rmtree(get_git_mirror_path(pkg), ignore_errors=True)
+        os.makedirs(get_git_mirror_dir(), exist_ok=True)
+        with open(os.path.join(get_git_mirror_dir(), 'mirrors.json'), 'w', encoding='utf8') as f:
+            json.dump(git_mirrors, f)
+        git_mirrors_dirty = False
+    logger.info(f'git mirror index saved: {len(git_mirrors)} mirrors, {total} bytes, {pruned} pruned')
+
+
+def get_git_mirror_entry(pkg):
+    """Returns the index entry of the mirror of a pkg, None if it has no mirror
+    """
+    with git_mirrors_lock:
+        if git_mirrors == None:
+            load_git_mirrors()
+        return git_mirrors.get(pkg)
+
+
+def get_dir_size(directory):
+    size = 0
+    for root, dirs, files in os.walk(directory):
+        for filename in files:
+            size += os.path.getsize(os.path.join(root, filename))
+    return size
+
+
+def update_git_mirror(pkg, git_url, create=True):
+    """Returns the bare mirror of the dist-git repo of a pkg
+       the repo is mirrored the first time, after that only fetched incrementally when the mirror is older than git_mirror_ttl
 
     Args:
-        url (_type_): _description_
+        pkg (string): package name
+        git_url (string): dist-git repo url
+        create (bool): False = only update an existing mirror
 
     Returns:
-        _type_: _description_
+        string: mirror path, None if there is no mirror
+    """
+    global git_mirrors_dirty
+    mirror_path = get_git_mirror_path(pkg)
+    with git_mirrors_lock:
+        lock = git_mirror_locks.setdefault(pkg, threading.Lock())
+    with lock:
+        entry = get_git_mirror_entry(pkg)
+        if entry == None and (not create or http_offline):
+            return None
+        if entry != None and (http_offline or time.time() - entry['fetched'] < git_mirror_ttl):
+            fetched, size = entry['fetched'], entry['size']
+        else:
+            try:
+                if entry == None:
+                    shutil.rmtree(mirror_path, ignore_errors=True) # leftover of an interrupted clone
+                    git.Repo.clone_from(git_url, mirror_path, mirror=True)
+                    logger.info(f'{pkg}: mirrored {git_url}')
+                else:
+                    git.Repo(mirror_path).git.fetch('--prune', 'origin')
+                    logger.info(f'{pkg}: mirror fetched from {git_url}')
+                fetched, size = time.time(), get_dir_size(mirror_path)
+            except git.GitCommandError as e:
+                logger.error(f'{pkg}: could not update the mirror of {git_url}: {e}')
+                if entry == None:
+                    return None
+                fetched, size = entry['fetched'], entry['size'] # the stale mirror is still used
+        with git_mirrors_lock:
+            git_mirrors[pkg] = {'fetched': fetched, 'accessed': time.time(), 'size': size}
+            git_mirrors_dirty = True
+    return mirror_path
+
+
+def update_git_mirrors(pkgs):
+    """Fetches in parallel the existing mirrors of pkgs that are older than git_mirror_ttl
+       so the git fallback finds them up to date, pkgs without a mirror are left alone
+
+    Args:
+        pkgs (list): package names
+    """
+    if http_offline:
+        return
+    stale_pkgs = []
+    for pkg in dict.fromkeys(pkgs):
+        entry = get_git_mirror_entry(pkg)
+        if entry != None and time.time() - entry['fetched'] >= git_mirror_ttl:
+            stale_pkgs.append(pkg)
+    if len(stale_pkgs) == 0:
+        return
+    logger.info(f'fetching {len(stale_pkgs)} git mirrors')
+    with ThreadPoolExecutor(max_workers=max(git_mirror_workers, 1)) as executor:
+        list(executor.map(lambda pkg: update_git_mirror(pkg, f'https://src.fedoraproject.org/rpms/{pkg}.git', create=False), stale_pkgs))
+
+
+def get_git_mirror_branches(mirror_path):
+    """Branch refs of a mirror, sorted like the output of git ls-remote --heads
+    """
+    return git.Repo(mirror_path).git.for_each_ref('--format=%(refname)', 'refs/heads').split('\n')
+
+
+def export_git_mirror_specs(mirror_path, branch, clone_path):
+    """Writes the spec files of a mirror branch under clone_path, no working tree is checked out
+
+    Args:
+        mirror_path (string): bare mirror path
+        branch (string): branch name
+        clone_path (string): directory the spec files are written to
+
+    Returns:
+        int: spec files written
+    """
+    repo = git.Repo(mirror_path)
+    count = 0
+    for spec_path in repo.git.ls_tree('-r', '--name-only', branch).split('\n'):
+        if not spec_path.endswith('.spec'):
+            continue
+        file_path = os.path.join(clone_path, spec_path)
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        with open(file_path, 'wb') as f:
+            f.write(repo.git.show(f'{branch}:{spec_path}', stdout_as_string=False))
+        count += 1
+    return count
+
+
+def get_fedora_git_branch_name(git_url, pkg=None):
+    """Fedora branch of a dist-git repo the pkg info is taken from, ex. 'f41'
+       the branch list comes from the local refs of the pkg mirror if there is one, else from git ls-remote
+
+    Args:
+        git_url (string): dist-git repo url
+        pkg (string): package name, None = always use git ls-remote
+
+    Returns:
+        string: branch name
     """
     branch_name = ''
-    g = git.cmd.Git()
-    branches = g.ls_remote("--heads", git_url).split('\n')
+    branches = None
+    if pkg != None and get_git_mirror_entry(pkg) != None:
+        mirror_path = update_git_mirror(pkg, git_url, create=False)
+        if mirror_path != None:
+            branches = get_git_mirror_branches(mirror_path)
+    if branches == None:
+        g = git.cmd.Git()
+        branches = g.ls_remote("--heads", git_url).split('\n')
     for  branch_str in reversed(branches):
         branch_str = branch_str.strip() #strip \n\r
         branch_token = branch_str.split('/')
@@ -613,6 +2541,35 @@ def update_missing_macros(file_path, url):
     return url
 
 
+def get_fedora_raw_spec(pkg, branch, clone_path):
+    """Fetches only the spec file of a dist-git branch into clone_path, instead of cloning the whole repo
+
+    Args:
+        pkg (string): package name
+        branch (string): dist-git branch, ex. 'f41'
+        clone_path (string): directory the spec is written to, same place a clone would go
+
+    Returns:
+        bool: True if the spec was fetched
+    """
+    spec_url = f'https://src.fedoraproject.org/rpms/{pkg}/raw/{branch}/f/{pkg}.spec'
+    try:
+        response = http_get(spec_url)
+    except requests.RequestException as e:
+        logger.error(f'{spec_url} could not be fetched: {e}')
+        return False
+    if response.status_code != 200 or not response.content.strip():
+        logger.info(f'{spec_url} not found, status {response.status_code}')
+        return False
+    os.makedirs(clone_path, exist_ok=True)
+    file_path = os.path.join(clone_path, f'{pkg}.spec')
+    with open(f'{file_path}.tmp', 'wb') as f: # the bytes as served, dist-git sends no charset and the spec readers decode utf8
+        f.write(response.content)
+    os.replace(f'{file_path}.tmp', file_path)
+    logger.info(f'{pkg}: fetched {spec_url}')
+    return True
+
+
 def get_upstream_url_from_specfile(file_path):
     """_summary_
 
@@ -622,26 +2579,12 @@ def get_upstream_url_from_specfile(file_path):
     Returns:
         _type_: _description_
     """
-    url = 'Not_Found'
-    spec = Spec.from_file(file_path)
-    if spec.url != None:
-        if '%' in spec.url:
-            url = replace_macros(spec.url, spec)
-            if '%' in url: # handle unresolved macros
-                logger.error(f'ERROR: could not resolve pkg URL macro for  {spec.name}')
-                url = 'Not_Found'
-        else:
-            url = spec.url
-
+    record = get_spec_record(file_path)
+    if record.url_unresolved:
+        logger.error(f'ERROR: could not resolve pkg URL macro for  {record.name}')
         
-    logger.info(f'{replace_macros(spec.name, spec)} URL = {url}')
-    # url_line = search_in_file(file_path, 'URL:')
-    # url_line = url_line.strip() #strip \n\r   
-    # url = re.split(' |\t', url_line)
-    # url = url[-1]
-    # if '%' in url:
-    #     url = update_missing_macros(file_path, url)
-    return url
+    logger.info(f'{record.name} URL = {record.url}')
+    return record.url
     
     
 def get_fedora_pkg_info_from_git(pkg):
@@ -658,29 +2601,28 @@ def get_fedora_pkg_info_from_git(pkg):
     upstream_src = 'Not_Found'
     try:
         if not os.path.exists(tmp_git_dir):
-            os.mkdir(tmp_git_dir, exist_ok=True)
+            os.makedirs(tmp_git_dir, exist_ok=True)
             print("Folder created successfully!")
         
         git_url = f'https://src.fedoraproject.org/rpms/{pkg}.git'
         #check if url exists
         try:
-            response = requests.get(git_url)
+            response = http_get(git_url, read_body=False)
             if response.status_code == 200:
                 print(f"{git_url} is valid and exists on the internet")
                 clone_path = f'./{tmp_git_dir}/{pkg}'
-                fedora_git_branch = get_fedora_git_branch_name(git_url) # We need to find this for every pkg, as this is needed to clone the right git branch and also use it construct the .src.rpm url
-                if not os.path.exists(clone_path): # skip if already checked out                    
-                    repo = git.Repo.clone_from(git_url, clone_path, branch=fedora_git_branch)
-                    # disabling the below code will use the refs/head/f41 
-                    # commit_id = get_commit_id(clone_path)
-                    # print(f"pkg:{pkg} fedora_git_branch:{fedora_git_branch} commit_id:{commit_id}")
-                    # if commit_id != None:
-                    #     repo.git.checkout(commit_id)
-                        
+                fedora_git_branch = get_fedora_git_branch_name(git_url, pkg) # We need to find this for every pkg, as this is needed to clone the right git branch and also use it construct the .src.rpm url
+                git_spec_index = get_spec_index(tmp_git_dir, persist=False) # specs are added to the index as they are fetched
+                # the spec is refreshed on every run, the raw fetch goes through the http cache and the mirror is only fetched when older than git_mirror_ttl
+                if not fedora_git_raw_spec or not get_fedora_raw_spec(pkg, fedora_git_branch, clone_path):
+                    mirror_path = update_git_mirror(pkg, git_url)
+                    if mirror_path != None:
+                        export_git_mirror_specs(mirror_path, fedora_git_branch, clone_path)
+                git_spec_index.add_tree(clone_path)
                     
                 #check if SPEC file for the pkg exists
                 filename = f'{pkg}.spec'
-                file_path = find_file(filename, tmp_git_dir)
+                file_path = git_spec_index.find(filename)
                 if file_path != None: # to handle pks like libwpe, which has no spec file
                     fedora_version = get_version_info_from_specfile(file_path)
                     fedora_release = get_release_info_from_specfile(file_path)
@@ -692,6 +2634,8 @@ def get_fedora_pkg_info_from_git(pkg):
                         fedora_release_str = f'{fedora_release}.{fedora_git_branch}'
         except requests.ConnectionError as exception:
             print(f"{git_url} does not exist on Internet: exception : {exception}")
+        except git.GitCommandError as exception:
+            logger.error(f'{pkg}: git error for {git_url}: {exception}')
             
     except OSError as e:
         print(f"An error occurred: {e}")
@@ -699,76 +2643,252 @@ def get_fedora_pkg_info_from_git(pkg):
     return (fedora_version, fedora_release_str, upstream_src)
 
 
-def get_latest_fedora_release(pkg_url):
-    """Check if the link's href ends with .fc41/.
-    Extract the date next to the link and determine the latest date.
+DirEntry = namedtuple('DirEntry', ['href', 'date']) # kojipkgs directory listing row, date 'YYYY-MM-DD HH:MM' or None
+KojiBuild = namedtuple('KojiBuild', ['nvr', 'version', 'release', 'state']) # row of the builds table of a koji packageinfo page
+dir_listing_date_pattern = re.compile(r'\d{4}-\d{2}-\d{2} \d{2}:\d{2}')
+fedora_release_pattern = re.compile(r'\.fc(\d+)$')
+
+
+def get_html_parser_backend():
+    """Returns the html parser backend used by the koji / kojipkgs scrapers
+    """
+    if html_parser_backend != 'auto':
+        return html_parser_backend
+    if LexborHTMLParser != None:
+        return 'selectolax'
+    if lxml_html != None:
+        return 'lxml'
+    return 'bs4'
+
+
+def get_html_parser_backends():
+    """Returns the html parser backends installed
+    """
+    backends = []
+    if LexborHTMLParser != None:
+        backends.append('selectolax')
+    if lxml_html != None:
+        backends.append('lxml')
+    backends.append('bs4')
+    return backends
+
+
+def iter_links_bs4(content):
+    for link in BeautifulSoup(content, 'html.parser').find_all('a'):
+        href = link.get('href')
+        if href:
+            yield href, link.find_next_sibling(string=True)
+
+
+def iter_links_lxml(content):
+    if not content.strip():
+        return
+    for link in lxml_html.fromstring(content).iter('a'):
+        href = link.get('href')
+        if href:
+            node = link # the text after the link, or after the first following element with text after it
+            while node != None and node.tail == None:
+                node = node.getnext()
+            yield href, node.tail if node != None else None
+
+
+def iter_links_selectolax(content):
+    for link in LexborHTMLParser(content).css('a'):
+        href = link.attributes.get('href')
+        if href:
+            node = link.next
+            while node != None and node.tag != '-text':
+                node = node.next
+            yield href, node.text_content if node != None else None
+
+
+def parse_dir_listing(content, backend=None):
+    """Rows of a kojipkgs directory listing in one pass: every link with its href and the date written after it
+
+    Args:
+        content (bytes): html of the listing
+        backend (string): html parser backend, None = html_parser_backend
+
+    Returns:
+        list: DirEntry of every link, in page order
+    """
+    backend = backend or get_html_parser_backend()
+    if backend == 'selectolax':
+        links = iter_links_selectolax(content)
+    elif backend == 'lxml':
+        links = iter_links_lxml(content)
+    else:
+        links = iter_links_bs4(content)
+    entries = []
+    for href, text in links:
+        match = dir_listing_date_pattern.search(text) if text else None
+        entries.append(DirEntry(href, match.group() if match else None))
+    return entries
+
+
+def get_latest_dir_entry(entries, suffix=''):
+    """Returns the href with the latest date among the listing rows whose href ends with suffix, None if there is none
+       dates are 'YYYY-MM-DD HH:MM' strings so they compare like datetimes, the first one wins a tie
+    """
+    latest = None
+    for entry in entries:
+        if entry.date != None and entry.href.endswith(suffix) and (latest == None or entry.date > latest.date):
+            latest = entry
+    return latest.href if latest != None else None
+
+
+def iter_build_rows_bs4(content):
+    taglist_section = BeautifulSoup(content, 'html.parser').find(id='taglist')
+    if not taglist_section:
+        return 'taglist', []
+    first_table = taglist_section.find_previous('table')
+    if not first_table:
+        return 'table', []
+    return None, [[(td.text.strip(), td.get('class') or []) for td in row.find_all('td')] for row in first_table.find_all('tr')[1:]]
+
+
+def iter_build_rows_lxml(content):
+    if not content.strip():
+        return 'taglist', []
+    first_table = None
+    for element in lxml_html.fromstring(content).iter(lxml_etree.Element): # the last table starting before the taglist section
+        if element.get('id') == 'taglist':
+            break
+        if element.tag == 'table':
+            first_table = element
+    else:
+        return 'taglist', []
+    if first_table == None:
+        return 'table', []
+    return None, [[(td.text_content().strip(), (td.get('class') or '').split()) for td in row.iter('td')] for row in list(first_table.iter('tr'))[1:]]
+
+
+def iter_build_rows_selectolax(content):
+    first_table = None
+    for node in LexborHTMLParser(content).root.traverse(): # the last table starting before the taglist section
+        if node.id == 'taglist':
+            break
+        if node.tag == 'table':
+            first_table = node
+    else:
+        return 'taglist', []
+    if first_table == None:
+        return 'table', []
+    return None, [[(td.text().strip(), (td.attributes.get('class') or '').split()) for td in row.css('td')] for row in first_table.css('tr')[1:]]
+
+
+def parse_koji_builds(content, backend=None):
+    """Rows of the builds table of a koji packageinfo page (the first table before the taglist section) in one pass
 
     Args:
-        pkg_url (_type_): _description_
+        content (bytes): html of the packageinfo page
+        backend (string): html parser backend, None = html_parser_backend
 
     Returns:
-        _type_: _description_
+        tuple: (missing, builds) missing is 'taglist' / 'table' if the page has no builds table else None, 
+               builds is the KojiBuild of every row with a state of 'complete', 'failed' or None
     """
-    latest_fedora_rel = 'Not_Found'
+    backend = backend or get_html_parser_backend()
+    if backend == 'selectolax':
+        missing, rows = iter_build_rows_selectolax(content)
+    elif backend == 'lxml':
+        missing, rows = iter_build_rows_lxml(content)
+    else:
+        missing, rows = iter_build_rows_bs4(content)
+    builds = []
+    for cols in rows:
+        if len(cols) >= 4:  # Ensure there are enough columns
+            # Determine the state from the class of the <td> element
+            state_classes = cols[3][1]
+            if 'complete' in state_classes:
+                state = 'complete'
+            elif 'failed' in state_classes:
+                state = 'failed'
+            else:
+                state = None  # Handle unexpected cases
+            builds.append(KojiBuild(cols[0][0], cols[1][0], cols[2][0], state))
+    return missing, builds
 
-    response = requests.get(pkg_url)
-    if response.status_code == 200:
-        print(f"Pkg URL {pkg_url}: EXIST")
 
-        soup = BeautifulSoup(response.content, 'html.parser')
+def bench_html_parsers(directory, rounds=20):
+    """Micro-benchmark of the html parser backends on koji / kojipkgs pages saved in a directory 
+       (ex. the bodies kept in cache_dir/http-cache), pages with a taglist section are parsed as
+       packageinfo pages, the others as directory listings
 
-        # Find all 'a' tags
-        links = soup.find_all('a')
+    Args:
+        directory (string): directory of the saved pages
+        rounds (int): times every page is parsed by every backend
+    """
+    pages = []
+    for name in sorted(os.listdir(directory)):
+        file_path = os.path.join(directory, name)
+        if os.path.isfile(file_path):
+            with open(file_path, 'rb') as f:
+                pages.append(f.read())
+    if pages == []:
+        print(f'No pages found in {directory}')
+        return
+    builds_pages = [page for page in pages if b'taglist' in page]
+    listing_pages = [page for page in pages if b'taglist' not in page]
+    print(f'{len(builds_pages)} packageinfo pages, {len(listing_pages)} directory listings, {rounds} rounds')
+
+    results = {}
+    for backend in get_html_parser_backends():
+        start = time.perf_counter()
+        for _ in range(rounds):
+            outputs = [parse_koji_builds(page, backend) for page in builds_pages] + [parse_dir_listing(page, backend) for page in listing_pages]
+        results[backend] = (time.perf_counter() - start, outputs)
+
+    base_time, base_outputs = results['bs4']
+    for backend, (elapsed, outputs) in results.items():
+        same = 'same records' if outputs == base_outputs else 'DIFFERENT records'
+        print(f'{backend:>10}: {elapsed * 1000 / (rounds * len(pages)):8.3f} ms/page  {base_time / elapsed:6.1f}x vs bs4  {same}')
+
+
+def make_dir_listing(status_code, content):
+    """(status_code, DirEntry list) of a fetched kojipkgs directory page, it is parsed only if it exists
+    """
+    return (status_code, parse_dir_listing(content) if status_code == 200 else [])
 
-        # Initialize variables to track the latest date and href
-        latest_date = None
-        latest_href = None
 
-        # Regular expression to extract dates in the format 'YYYY-MM-DD HH:MM'
-        date_pattern = re.compile(r'\d{4}-\d{2}-\d{2} \d{2}:\d{2}')
+def get_dir_listing(pkg_url):
+    """Returns the kojipkgs directory listing of a url, fetched and parsed once per run
+       the releases & versions of a listing and their dates are then looked up locally
 
-        # Iterate over all links to find the latest one with trailing '.fc41/'
-        for link in links:
-            href = link.get('href')
-            if href and href.endswith('.fc41/'):
-                # Find the date text corresponding to the link
-                date_text = link.find_next_sibling(string=True)
-                if date_text and date_pattern.search(date_text):
-                    date_str = date_pattern.search(date_text).group()
-                    date_obj = datetime.strptime(date_str, '%Y-%m-%d %H:%M')
-                    if latest_date is None or date_obj > latest_date:
-                        latest_date = date_obj
-                        latest_href = href
-        if latest_href != None:                 
-            latest_fedora_rel = latest_href[:-1]
-        logger.info(f"Latest href with trailing '.fc41/':{latest_href}")
-    else:
-        logger.error(f"ERROR: Pkg URL {pkg_url}: Does Not EXIST")
-        print(f"ERROR: Pkg URL {pkg_url}: Does Not EXIST")
-    return latest_fedora_rel   
-        
-# Function to parse and split version strings
-def parse_version(v):
-    # Replace invalid characters with dots for splitting
-    cleaned = re.sub(r'[^0-9a-zA-Z]', '.', v)
-    return [int(x) if x.isdigit() else x for x in cleaned.split('.')]
-    
+    Args:
+        pkg_url (string): kojipkgs directory url
+
+    Returns:
+        tuple: (status_code, DirEntry list)
+    """
+    with kojipkgs_listings_lock:
+        listing = kojipkgs_listings.get(pkg_url)
+    if listing == None:
+        response = http_get(pkg_url)
+        listing = make_dir_listing(response.status_code, response.content)
+        with kojipkgs_listings_lock:
+            kojipkgs_listings[pkg_url] = listing
+    return listing
 
-def get_version_list_from_pkg_url(pkg_url):
-    response = requests.get(pkg_url)
-    if response.status_code == 200:
-        logger.info(f"Pkg URL {pkg_url}: EXIST")
-        # Parse the HTML content using BeautifulSoup
-        soup = BeautifulSoup(response.content, 'html.parser')
 
-        # Find all 'a' tags and get their href values
-        links = soup.find_all('a')
+def get_listing_versions(pkg_url, listing):
+    """Version directories listed in a kojipkgs pkg page
 
+    Args:
+        pkg_url (string): kojipkgs pkg url
+        listing (tuple): get_dir_listing() of pkg_url
+
+    Returns:
+        list: versions, None if the page does not exist
+    """
+    status_code, entries = listing
+    if status_code == 200:
+        logger.info(f"Pkg URL {pkg_url}: EXIST")
         # Extract, decode, and filter version values
         version_list = []
-        for link in links:
-            href = link.get('href')
-            if href and href.endswith('/'):
+        for entry in entries:
+            href = entry.href
+            if href.endswith('/'):
                 # Strip leading/trailing slashes and decode URL-encoded characters
                 version = unquote(href.strip('/'))
                 # if '~b' in version or 'E' in version or 'b' in version: # Dangerous way to handle 'PyGreSQL'  ver '6.0~b1 and Xaw3d ver '1.5E' , stunnel ver '5.05b5'
@@ -790,13 +2910,14 @@ def get_version_list_from_pkg_url(pkg_url):
         #     print(version)
         return version_list
 
-def get_sorted_version_list(pkg_url):
-    version_list = get_version_list_from_pkg_url(pkg_url)
+def sort_version_list(pkg_url, version_list):
+    """Sorts the versions listed in a kojipkgs pkg page, latest first
+    """
     # Sort the list using the custom sorting function
     sorted_versions = []
     if version_list != []:
         try:
-            sorted_versions = sorted(version_list, key=parse_version, reverse=True)
+            sorted_versions = sorted(version_list, key=parse_rpm_version, reverse=True)
         except:
             logger.error("ERROR sorting pkg url {pkg_url}")
             return []
@@ -809,46 +2930,25 @@ def get_sorted_version_list(pkg_url):
     #     print(v)
     return sorted_versions   
 
-def get_fedora_release_info(pkg_url, search_str):
-    """Check if the link's href ends with given search string.
-    Extract the date next to the link and determine the latest date.
+def find_fedora_release(pkg_url, listing, search_str):
+    """Latest release directory ending with search_str in a kojipkgs version page
 
     Args:
-        pkg_url (_type_): _description_
+        pkg_url (string): kojipkgs version url
+        listing (tuple): get_dir_listing() of pkg_url
+        search_str (string): release suffix, ex. '.fc41/'
 
     Returns:
-        _type_: _description_
+        string: release, 'Not_Found' if there is none
     """
     fedora_rel = 'Not_Found'
 
-    response = requests.get(pkg_url)
-    if response.status_code == 200:
+    status_code, entries = listing
+    if status_code == 200:
         logger.info(f"Pkg URL {pkg_url}: EXIST")
 
-        soup = BeautifulSoup(response.content, 'html.parser')
-
-        # Find all 'a' tags
-        links = soup.find_all('a')
-
-        # Initialize variables to track the latest date and href
-        latest_date = None
-        latest_href = None
-
-        # Regular expression to extract dates in the format 'YYYY-MM-DD HH:MM'
-        date_pattern = re.compile(r'\d{4}-\d{2}-\d{2} \d{2}:\d{2}')
-
-        # Iterate over all links to find the latest one with trailing '.fc41/'
-        for link in links:
-            href = link.get('href')
-            if href and href.endswith(search_str):
-                # Find the date text corresponding to the link
-                date_text = link.find_next_sibling(string=True)
-                if date_text and date_pattern.search(date_text):
-                    date_str = date_pattern.search(date_text).group()
-                    date_obj = datetime.strptime(date_str, '%Y-%m-%d %H:%M')
-                    if latest_date is None or date_obj > latest_date:
-                        latest_date = date_obj
-                        latest_href = href
+        # the latest link with the trailing search_str, ex. '.fc41/'
+        latest_href = get_latest_dir_entry(entries, search_str)
         if latest_href != None:                 
             fedora_rel = latest_href[:-1]
         logger.info(f"Latest href with trailing '{search_str}':{latest_href}")
@@ -858,44 +2958,26 @@ def get_fedora_release_info(pkg_url, search_str):
     return fedora_rel
 
 
-def get_latest_href_from_pkg_url(pkg_url):
-    '''
-    For a given url finds the href attributes and their corresponding dates. 
-    It compares the dates to find the href with the latest date.
-    '''
-    # latest_fedora_ver = 'Not_Found'
-    # Send a GET request to the URL
-    response = requests.get(pkg_url)
-    if response.status_code == 200:
+def find_latest_href(pkg_url, listing):
+    """Href with the latest date in a kojipkgs directory page
+
+    Args:
+        pkg_url (string): kojipkgs directory url
+        listing (tuple): get_dir_listing() of pkg_url
+
+    Returns:
+        string: href without the trailing '/', 'Not_Found' if there is none
+    """
+    latest_href = 'Not_Found'
+    status_code, entries = listing
+    if status_code == 200:
         logger.info(f"Pkg URL {pkg_url}: EXIST")
-        # Parse the HTML content using BeautifulSoup
-        soup = BeautifulSoup(response.content, 'html.parser')
-
-        # Find all 'a' tags and their corresponding text
-        links = soup.find_all('a')
-
-        # Initialize variables to track the latest date and href
-        latest_date = None
-        latest_href = 'Not_Found'
-
-        # Regular expression to extract dates in the format 'YYYY-MM-DD HH:MM'
-        date_pattern = re.compile(r'\d{4}-\d{2}-\d{2} \d{2}:\d{2}')
-
-        # Iterate over all links to find the latest one
-        for link in links:
-            # Find the href attribute
-            href = link.get('href')
-            if href:
-                # Find the date text corresponding to the link
-                date_text = link.find_next_sibling(string=True)
-                if date_text and date_pattern.search(date_text):
-                    date_str = date_pattern.search(date_text).group()
-                    date_obj = datetime.strptime(date_str, '%Y-%m-%d %H:%M')
-                    if latest_date is None or date_obj > latest_date:
-                        latest_date = date_obj
-                        latest_href = href
-        if latest_href != 'Not_Found':
+        # the link with the latest date
+        latest_href = get_latest_dir_entry(entries)
+        if latest_href != None:
             latest_href = latest_href[:-1]
+        else:
+            latest_href = 'Not_Found'
         logger.info(f"Latest href: {latest_href}")
     else:
         logger.error(f"ERROR: Pkg URL {pkg_url}: Does Not EXIST")
@@ -907,196 +2989,670 @@ def get_fedora_pkg_info_from_kojipkgs_url(pkg):
     """ Extracts fedora pkg info from kojipkgs url
 
     Args:
-        pkg (_type_): _description_
+        pkg (string): package name
 
     Returns:
-        _type_: _description_
+        tuple: (fedora_version, fedora_release)
+    """
+    walk = walk_kojipkgs_listings(pkg)
+    try:
+        url = next(walk)
+        while True:
+            url = walk.send(get_dir_listing(url))
+    except StopIteration as done:
+        return done.value
+
+
+def walk_kojipkgs_listings(pkg):
+    """Picks the fedora version & release of a pkg from its kojipkgs listings, shared by the sync and the async scrapers:
+       the latest version if it has a fc41 release, else if it has a fc42 release or no release at all the first
+       version with a fc41 release, else the latest release of the latest version.
+       Generator: yields the url of every listing it needs and is sent back get_dir_listing() of that url,
+       listings are only fetched as far as the rules need them
+
+    Args:
+        pkg (string): package name
+
+    Returns:
+        tuple: (fedora_version, fedora_release), through StopIteration.value
     """
     pkg_url = f'{kojipkgs_url}{pkg}'
-    sorted_versions = get_sorted_version_list(pkg_url)
-    fedora_version = 'Not_Found'
-    fedora_release = 'Not_Found'
-    if sorted_versions != []:
-        fedora_rel_info = get_fedora_release_info(f'{pkg_url}/{sorted_versions[0]}', f'.fc41/')
-        if 'fc41'in fedora_rel_info: # check if sorted_versions[0] has fc41
-            fedora_version = sorted_versions[0]
-            fedora_release = fedora_rel_info
-            return fedora_version, fedora_release
-        elif fedora_rel_info == 'Not_Found' or 'fc42' in get_fedora_release_info(f'{pkg_url}/{sorted_versions[0]}', f'.fc42/'): #sorted_versions[0] has fc42 but no fc41 or handle empty version dir like 'cairomm'
-            # loop through the sorted_versions to find a fc41 release 
-            if len(sorted_versions) > 1: # there are more than one fedora versions, lets loop through each to find fc41
-                i = 1 # start from 1 since 0th one already taken care during the very first search
-                for i in range(len(sorted_versions)):
-                    print(f'searching fedora version : {sorted_versions[i]} for release fc41')
-                    fedora_rel_info = get_fedora_release_info(f'{pkg_url}/{sorted_versions[i]}', f'.fc41/')
-                    if 'fc41'in fedora_rel_info: # check if sorted_versions[i] has fc41
-                        fedora_version = sorted_versions[i]
-                        fedora_release = fedora_rel_info
-                        return fedora_version, fedora_release
-                    else:
-                        i = i + 1
-            else: #
-                fedora_rel_info = get_latest_href_from_pkg_url(f'{pkg_url}/{sorted_versions[0]}')
-                fedora_version = sorted_versions[0]
-                fedora_release = fedora_rel_info
-                return fedora_version, fedora_release # latest_rel from sorted_versions[0]
-        else:
-            fedora_rel_info = get_latest_href_from_pkg_url(f'{pkg_url}/{sorted_versions[0]}')
-            fedora_version = sorted_versions[0]
-            fedora_release = fedora_rel_info
-            return fedora_version, fedora_release # latest_rel from sorted_versions[0]
-   
-    return (fedora_version, fedora_release)
+    sorted_versions = sort_version_list(pkg_url, get_listing_versions(pkg_url, (yield pkg_url)))
+    if sorted_versions == []:
+        return ('Not_Found', 'Not_Found')
+    latest_url = f'{pkg_url}/{sorted_versions[0]}'
+    latest_listing = yield latest_url # fc41, fc42 and latest href are looked up in this one listing
+    fedora_rel_info = find_fedora_release(latest_url, latest_listing, '.fc41/')
+    if 'fc41' in fedora_rel_info: # check if sorted_versions[0] has fc41
+        return sorted_versions[0], fedora_rel_info
+    elif fedora_rel_info == 'Not_Found' or 'fc42' in find_fedora_release(latest_url, latest_listing, '.fc42/'): #sorted_versions[0] has fc42 but no fc41 or handle empty version dir like 'cairomm'
+        if len(sorted_versions) > 1: # there are more than one fedora versions, lets loop through each to find fc41
+            for version in sorted_versions:
+                print(f'searching fedora version : {version} for release fc41')
+                version_url = f'{pkg_url}/{version}'
+                fedora_rel_info = find_fedora_release(version_url, (yield version_url), '.fc41/')
+                if 'fc41' in fedora_rel_info: # check if version has fc41
+                    return version, fedora_rel_info
+            return ('Not_Found', 'Not_Found')
+    return sorted_versions[0], find_latest_href(latest_url, latest_listing) # latest_rel from sorted_versions[0]
 
 def get_fedora_info_from_kojipkgs_pkgid(pkg):
     
     pkgid_url = f'{koji_pkgid_url}{pkg}'
-    
-    fedora_version = 'Not_Found'
-    fedora_release_str = 'Not_Found'
     # Send a GET request to the URL
-    response = requests.get(pkgid_url)
+    response = http_get(pkgid_url)
+    return parse_kojipkgs_pkgid_page(response.status_code, response.content)
 
-    # Check if the request was successful
-    if response.status_code == 200:
-        # Parse the HTML content
-        soup = BeautifulSoup(response.content, 'html.parser')
-        
-        # Find the section with id 'taglist'
-        taglist_section = soup.find(id='taglist')
 
-        # If the taglist section is found, find the first table before it
-        if taglist_section:
-            # Get the first table before the taglist section
-            first_table = taglist_section.find_previous('table')
-            
-            # Check if the first table was found
-            if first_table:
-                # Initialize a list to hold the build data
-                builds_list = []
-                
-                # Iterate through the rows of the first table
-                for row in first_table.find_all('tr')[1:]:  # Skip the header row
-                    cols = row.find_all('td')
-                    if len(cols) >= 4:  # Ensure there are enough columns
-                        name = cols[0].text.strip()
-                        version = cols[1].text.strip()
-                        release = cols[2].text.strip()
-
-                        # Determine the state from the class of the <td> element
-                        state_cell = cols[3]
-                        if 'complete' in state_cell['class']:
-                            state = 'complete'
-                        elif 'failed' in state_cell['class']:
-                            state = 'failed'
-                        else:
-                            state = None  # Handle unexpected cases
-
-                        # Append the data to the list if state is complete
-                        if state == 'complete':
-                            builds_list.append({
-                                'Name': name,
-                                'Version': version,
-                                'Release': release,
-                                'State': state
-                            })
-                
-                # Filter for the desired names
-                prioritized_names = [build['Name'] for build in builds_list if build['Name'].endswith('.fc41')]
-                if prioritized_names:
-                    result_name = prioritized_names[0]  # Get the first one if it exists
-                else:
-                    # Check for other versions
-                    for version in range(40, 30, -1):  # Check .fc40 to .fc36
-                        prioritized_names = [build['Name'] for build in builds_list if build['Name'].endswith(f'.fc{version}')]
-                        if prioritized_names:
-                            result_name = prioritized_names[0]  # Get the first one found
-                            break
-                    else:
-                        result_name = None  # No matching names found
-
-                # Output the result
-                if result_name:
-                    # Split the result name using '-' followed by a number as delimiter
-                    split_name = re.split(r'-(?=\d)', result_name)
-                    # print(f"Selected Name: {result_name}")
-                    print(f"Split Name: {split_name}")
-                    if split_name:
-                        fedora_version = split_name[1]
-                        fedora_release_str = split_name[2]
-                else:
-                    print("No matching Name found.")
+def select_fedora_build(nvrs):
+    """Picks the build the fedora version is taken from: the first .fc41 build, 
+       else the first build of the latest older fedora release down to .fc31
+
+    Args:
+        nvrs (list): name-version-release of the complete builds, latest first
+
+    Returns:
+        string: nvr, None if there is no fedora build
+    """
+    first_nvrs = {} # fedora release number -> first nvr of that release, in one pass over nvrs
+    for nvr in nvrs:
+        match = fedora_release_pattern.search(nvr)
+        if match:
+            first_nvrs.setdefault(match.group(1), nvr)
+    for version in range(41, 30, -1):
+        if str(version) in first_nvrs:
+            return first_nvrs[str(version)]
+    return None
+
+
+def koji_hub_multicall(calls):
+    """Runs many koji hub calls in one XML-RPC multiCall round trip,
+       raises SourceUnavailableError when the hub cannot be reached or the multiCall itself fails
+
+    Args:
+        calls (list): (method, args, kwargs) of every call
+
+    Returns:
+        list: result of every call, None for a call that faulted
+    """
+    params = []
+    for method, args, kwargs in calls:
+        if kwargs:
+            args = args + ({**kwargs, '__starstar': True},) # koji's encoding of keyword arguments
+        params.append({'methodName': method, 'params': args})
+    body = xmlrpc.client.dumps((params,), 'multiCall')
+    try:
+        response = http_request(koji_hub_url, method='POST', data=body.encode('utf8'), headers={'Content-Type': 'text/xml'})
+        response.raise_for_status()
+        results = xmlrpc.client.loads(response.content)[0][0]
+        values = []
+        for (method, args, kwargs), result in zip(calls, results):
+            if isinstance(result, dict): # fault of this call, {faultCode, faultString}
+                logger.error(f'koji hub {method}{args} failed: {result.get("faultString")}')
+                values.append(None)
             else:
-                print("No table found before the taglist section.")
+                values.append(result[0])
+    except (requests.RequestException, xmlrpc.client.Error, ExpatError, IndexError, TypeError) as e: # Fault of the whole call, error status, garbled answer
+        raise SourceUnavailableError(f'koji hub multiCall failed: {e!r}') from e
+    return values
+
+
+def get_koji_hub_batch_info(pkgs):
+    """(fedora_version, fedora_release_str) of a batch of pkgs from the koji hub
+       two multiCall round trips: getPackageID of every pkg, then listBuilds of the pkgs known to koji
+
+    Args:
+        pkgs (list): package names
+
+    Returns:
+        dict: pkg -> (fedora_version, fedora_release_str)
+    """
+    infos = {pkg: ('Not_Found', 'Not_Found') for pkg in pkgs}
+    if http_offline:
+        logger.error(f'koji hub is not queried offline, {len(pkgs)} pkgs left Not_Found')
+        return infos
+    pkg_ids = koji_hub_multicall([('getPackageID', (pkg,), {}) for pkg in pkgs])
+    known = [(pkg, pkg_id) for pkg, pkg_id in zip(pkgs, pkg_ids) if pkg_id != None]
+    if known == []:
+        return infos
+    query_opts = {'order': '-completion_time', 'limit': koji_hub_builds_limit}
+    pkgs_builds = koji_hub_multicall([('listBuilds', (), {'packageID': pkg_id, 'state': 1, 'queryOpts': query_opts}) # state 1 = COMPLETE
+                                      for pkg, pkg_id in known])
+    for (pkg, pkg_id), builds in zip(known, pkgs_builds):
+        if builds == None:
+            continue
+        result_name = select_fedora_build([build['nvr'] for build in builds])
+        if result_name:
+            build = next(build for build in builds if build['nvr'] == result_name)
+            infos[pkg] = (build['version'], build['release'])
         else:
+            print(f"{pkg}: No matching Name found.")
+    return infos
+
+
+def get_fedora_info_from_koji_hub(pkgs):
+    """(fedora_version, fedora_release_str) of many pkgs from the koji hub XML-RPC API, 
+       same pick as get_fedora_info_from_kojipkgs_pkgid() without downloading any packageinfo page
+       koji_hub_batch_size pkgs are sent per round trip, fedora_lookup_workers batches at once
+
+    Args:
+        pkgs (list): package names
+
+    Returns:
+        dict: pkg -> (fedora_version, fedora_release_str)
+    """
+    infos = {}
+    batches = [pkgs[i:i + koji_hub_batch_size] for i in range(0, len(pkgs), koji_hub_batch_size)]
+    with ThreadPoolExecutor(max_workers=max(fedora_lookup_workers, 1)) as executor:
+        for batch_infos in executor.map(get_koji_hub_batch_info, batches):
+            infos.update(batch_infos)
+    return infos
+
+
+def parse_kojipkgs_pkgid_page(status_code, content):
+    """Latest complete fedora build listed in a koji packageinfo page
+
+    Args:
+        status_code (int): http status code of the packageinfo page
+        content (bytes): html of the packageinfo page
+
+    Returns:
+        tuple: (fedora_version, fedora_release_str)
+    """
+    fedora_version = 'Not_Found'
+    fedora_release_str = 'Not_Found'
+
+    # Check if the request was successful
+    if status_code == 200:
+        # the builds table, the first table before the taglist section
+        missing, builds = parse_koji_builds(content)
+        if missing == 'taglist':
             print("No taglist section found on the page.")
+        elif missing == 'table':
+            print("No table found before the taglist section.")
+        else:
+            # Filter for the desired names
+            result_name = select_fedora_build([build.nvr for build in builds if build.state == 'complete'])
+
+            # Output the result
+            if result_name:
+                # Split the result name using '-' followed by a number as delimiter
+                split_name = pkg_version_splitter.split(result_name)
+                # print(f"Selected Name: {result_name}")
+                print(f"Split Name: {split_name}")
+                if split_name:
+                    fedora_version = split_name[1]
+                    fedora_release_str = split_name[2]
+            else:
+                print("No matching Name found.")
     else:
-        print(f"Failed to retrieve data. Status code: {response.status_code}")
+        print(f"Failed to retrieve data. Status code: {status_code}")
     return (fedora_version, fedora_release_str)
 
 
+class AsyncFetcher:
+    """aiohttp session of the asyncio fetch engine, caps the requests in flight per host like http_get()
+    """
+    def __init__(self, session):
+        self.session = session
+        self.host_semaphores = {}
+
+    def get_host_semaphore(self, host):
+        semaphore = self.host_semaphores.get(host)
+        if semaphore == None:
+            semaphore = asyncio.Semaphore(http_host_limits.get(host, get_async_max_per_host()))
+            self.host_semaphores[host] = semaphore
+        return semaphore
+
+    async def get(self, url, read_body=True):
+        """GET url, with the http cache of http_get()
+
+        Args:
+            url (string): url
+            read_body (bool): False when only the status code is needed
+
+        Returns:
+            tuple: (status_code, content), the last status if every try got a 429 / 5xx status, 504 if offline and not cached
+        """
+        status_code, content, _ = await self.fetch(url, read_body)
+        return status_code, content
+
+    async def fetch(self, url, read_body=True, method='GET', headers=None):
+        """http_get() of the asyncio fetch engine, the http cache files are read and written
+           in worker threads so the event loop is never blocked on disk
+
+        Returns:
+            tuple: (status_code, content, headers)
+        """
+        entry = await asyncio.to_thread(get_http_cache_entry, url, read_body)
+        if entry != None and (http_offline or is_http_cache_fresh(entry)):
+            return entry['status'], await asyncio.to_thread(read_http_cache_body, entry), entry['headers']
+        if http_offline:
+            logger.error(f'{url} is not in the http cache, offline')
+            return 504, b'', {}
+
+        headers = dict(headers or {})
+        if entry != None:
+            headers.update(get_revalidation_headers(entry))
+        status_code, content, response_headers = await self.request(url, read_body, method, headers)
+        if status_code == 304 and entry != None:
+            refresh_http_cache_entry(url)
+            return entry['status'], await asyncio.to_thread(read_http_cache_body, entry), entry['headers']
+        await asyncio.to_thread(store_http_cache_entry, url, status_code, content, response_headers, read_body)
+        return status_code, content, response_headers
+
+    async def request(self, url, read_body, method, headers):
+        """request with the retries of http_get()
+
+        Returns:
+            tuple: (status_code, content, headers)
+        """
+        host = urlparse(url).hostname
+        semaphore = self.get_host_semaphore(host)
+        controller = get_host_controller(host)
+        for attempt in range(http_retries + 1):
+            async with semaphore:
+                await controller.acquire_async()
+                started = time.time()
+                status_code = retry_after = None # None = failed, any exception counts as a failure of the host
+                try:
+                    async with self.session.request(method, url, headers=headers) as response:
+                        content = await response.read() if read_body and response.status not in http_retry_statuses else b''
+                    status_code = response.status
+                    retry_after = get_retry_after(response.status, response.headers)
+                except async_retry_exceptions as exception:
+                    if attempt == http_retries:
+                        raise
+                    logger.warning(f'{url} failed: {exception!r}, retry {attempt + 1} of {http_retries}')
+                    response = None
+                finally:
+                    controller.release(time.time() - started, status_code, retry_after)
+            if response != None:
+                if response.status not in http_retry_statuses:
+                    return response.status, content, response.headers
+                if attempt == http_retries:
+                    return response.status, b'', response.headers
+                logger.warning(f'{url} returned {response.status}, retry {attempt + 1} of {http_retries}')
+            await asyncio.sleep(get_retry_delay(attempt))
+
+
+async def get_dir_listing_async(fetcher, pkg_url):
+    """get_dir_listing() with the asyncio fetch engine, listings are shared with the sync scrapers
+    """
+    with kojipkgs_listings_lock:
+        listing = kojipkgs_listings.get(pkg_url)
+    if listing == None:
+        listing = make_dir_listing(*await fetcher.get(pkg_url))
+        with kojipkgs_listings_lock:
+            kojipkgs_listings[pkg_url] = listing
+    return listing
+
+
+async def get_fedora_pkg_info_from_kojipkgs_url_async(fetcher, pkg):
+    """ get_fedora_pkg_info_from_kojipkgs_url() with the asyncio fetch engine,
+        the round trips of a pkg overlap with the other pkgs' lookups
+
+    Args:
+        fetcher (AsyncFetcher): fetcher
+        pkg (string): package name
+
+    Returns:
+        tuple: (fedora_version, fedora_release)
+    """
+    walk = walk_kojipkgs_listings(pkg)
+    try:
+        url = next(walk)
+        while True:
+            url = walk.send(await get_dir_listing_async(fetcher, url))
+    except StopIteration as done:
+        return done.value
+
+
+async def get_fedora_info_from_kojipkgs_pkgid_async(fetcher, pkg):
+    status_code, content = await fetcher.get(f'{koji_pkgid_url}{pkg}')
+    return parse_kojipkgs_pkgid_page(status_code, content)
+
+
+async def verify_src_link_async(fetcher, url):
+    """verify_src_link() with the asyncio fetch engine
+    """
+    with src_link_cache_lock:
+        link_info = src_link_cache.get(url)
+    if link_info != None:
+        return link_info
+    try:
+        status_code, _, headers = await fetcher.fetch(url, read_body=False, method='HEAD')
+        if status_code in (405, 501): # HEAD not allowed
+            status_code, _, headers = await fetcher.fetch(url, read_body=False, headers={'Range': 'bytes=0-0'})
+        link_info = make_src_link_info(status_code, headers)
+    except (requests.RequestException, aiohttp.ClientError, asyncio.TimeoutError) as e: # only this url is left unverified
+        logger.error(f'{url} not verified: {e!r}')
+        link_info = SrcLinkInfo(None, None, None)
+    if link_info.exists != None: # an unverified url is tried again by the next lookup
+        with src_link_cache_lock:
+            src_link_cache[url] = link_info
+    return link_info
+
+
+async def verify_src_links_async(urls):
+    async with open_async_session() as session:
+        fetcher = AsyncFetcher(session)
+        return await asyncio.gather(*[verify_src_link_async(fetcher, url) for url in urls])
+
+
+async def resolve_fedora_pkg_info_async(fetcher, pkg, sources):
+    """resolve_fedora_pkg_info() with the asyncio fetch engine, 
+       the koji hub source and the git fallback of pkg_url run in worker threads
+    """
+    for source in sources:
+        try:
+            return await get_fedora_pkg_info_from_source_async(fetcher, pkg, source)
+        except http_retry_exceptions + async_retry_exceptions + (SourceUnavailableError,) as e:
+            logger.error(f'{pkg}: {source} unavailable, failing over: {e!r}')
+    return make_fedora_pkg_info(pkg, sources[0], 'Not_Found', 'Not_Found', failed=True) # every source failed, not a real Not_Found
+
+
+async def get_fedora_pkg_info_from_source_async(fetcher, pkg, source):
+    """get_fedora_pkg_info_from_source() with the asyncio fetch engine
+    """
+    upstream_src = 'Not_Found'
+    if source == 'koji_hub':
+        return await asyncio.to_thread(get_fedora_pkg_info_from_source, pkg, source)
+    elif source == 'kojipkgs_pkgid':
+        fedora_version, fedora_release_str = await get_fedora_info_from_kojipkgs_pkgid_async(fetcher, pkg)
+    elif source == 'kojipkgs':
+        fedora_version, fedora_release_str = await get_fedora_pkg_info_from_kojipkgs_url_async(fetcher, pkg)
+    else:
+        fedora_version, fedora_release_str, upstream_src = await get_fedora_pkg_info_from_pkg_url_async(fetcher, pkg)
+        if fedora_version == 'Not_Found':
+            logger.error(f'{pkg}:info not found in pkg_url, Searching the pkg info from git')
+            fedora_version, fedora_release_str, upstream_src = await asyncio.to_thread(get_fedora_pkg_info_from_git, pkg)
+
+    return make_fedora_pkg_info(pkg, source, fedora_version, fedora_release_str, upstream_src)
+
+
+async def count_new_conn(session, context, params):
+    async_conn_stats['new'] += 1
+
+
+async def count_reused_conn(session, context, params):
+    async_conn_stats['reused'] += 1
+
+
+def open_async_session():
+    """aiohttp session of the asyncio fetch engine, up to async_max_in_flight requests in flight
+    """
+    connector = aiohttp.TCPConnector(limit=async_max_in_flight)
+    timeout = aiohttp.ClientTimeout(total=None, sock_connect=http_timeout[0], sock_read=http_timeout[1])
+    trace_config = aiohttp.TraceConfig()
+    trace_config.on_connection_create_end.append(count_new_conn)
+    trace_config.on_connection_reuseconn.append(count_reused_conn)
+    return aiohttp.ClientSession(connector=connector, timeout=timeout, trace_configs=[trace_config])
+
+
+async def resolve_fedora_pkgs_info_async(pkgs, sources):
+    """Resolves the fedora info of all the pkgs at once on one event loop
+
+    Args:
+        pkgs (list): package names
+        sources (list): fedora sources in failover order
+
+    Returns:
+        list: resolve_fedora_pkg_info() result of every pkg, in pkgs order
+    """
+    async with open_async_session() as session:
+        fetcher = AsyncFetcher(session)
+        return await asyncio.gather(*[resolve_fedora_pkg_info_async(fetcher, pkg, sources) for pkg in pkgs])
+
+
+def use_async_fetch():
+    """True if the per pkg fedora lookups of this run can use the asyncio fetch engine
+       the koji hub source batches its own calls, the git fallback of pkg_url runs in worker threads
+    """
+    return fedora_async_fetch and aiohttp != None
+
+
+def get_fedora_sources():
+    """Fedora sources in failover order: the one selected by the extract_fedora_info_from_* flags, then the rest of fedora_source_chain
+    """
+    if extract_fedora_info_from_koji_hub:
+        selected = 'koji_hub'
+    elif extract_fedora_info_from_kojipkgs_pkgid:
+        selected = 'kojipkgs_pkgid'
+    elif extract_fedora_info_from_kojipkgs:
+        selected = 'kojipkgs'
+    else:
+        selected = 'pkg_url'
+    return [selected] + [source for source in fedora_source_chain if source != selected]
+
+
+def resolve_fedora_pkg_info(pkg, sources=None):
+    """Finds the latest fedora info of a pkg, this only does the network lookups and writes nothing
+       so many pkgs can be resolved at once. When the host of a source is down (circuit breaker open
+       or every retry failed) the next source is tried right away
+
+    Args:
+        pkg (string): package name
+        sources (list): fedora sources in failover order, None = get_fedora_sources()
+
+    Returns:
+        dict: source, fedora_version, fedora_release_str, upstream_src, src_url, failed
+    """
+    if sources == None:
+        sources = get_fedora_sources()
+    for source in sources:
+        try:
+            return get_fedora_pkg_info_from_source(pkg, source)
+        except http_retry_exceptions + (SourceUnavailableError,) as e:
+            logger.error(f'{pkg}: {source} unavailable, failing over: {e}')
+    return make_fedora_pkg_info(pkg, sources[0], 'Not_Found', 'Not_Found', failed=True) # every source failed, not a real Not_Found
+
+
+def get_fedora_pkg_info_from_source(pkg, source):
+    """Latest fedora info of a pkg from one source
+
+    Args:
+        pkg (string): package name
+        source (string): 'koji_hub', 'kojipkgs_pkgid', 'kojipkgs' or 'pkg_url'
+
+    Returns:
+        dict: source, fedora_version, fedora_release_str, upstream_src, src_url, failed
+    """
+    upstream_src = 'Not_Found'
+    if source == 'koji_hub':
+        fedora_version, fedora_release_str = get_fedora_info_from_koji_hub([pkg])[pkg]
+    elif source == 'kojipkgs_pkgid':
+        fedora_version, fedora_release_str = get_fedora_info_from_kojipkgs_pkgid(pkg)
+    elif source == 'kojipkgs':
+        fedora_version, fedora_release_str = get_fedora_pkg_info_from_kojipkgs_url(pkg)
+    else:
+        fedora_version, fedora_release_str, upstream_src = get_fedora_pkg_info_from_pkg_url(pkg)
+        if fedora_version == 'Not_Found':
+            logger.error(f'{pkg}:info not found in pkg_url, Searching the pkg info from git')
+            fedora_version, fedora_release_str, upstream_src = get_fedora_pkg_info_from_git(pkg)
+
+    return make_fedora_pkg_info(pkg, source, fedora_version, fedora_release_str, upstream_src)
+
+
+def make_fedora_pkg_info(pkg, source, fedora_version, fedora_release_str, upstream_src='Not_Found', failed=False):
+    """resolve_fedora_pkg_info() result of a pkg, src_url is the Fedora Sources Link to verify,
+       failed is True when no source could be queried and the Not_Found values are only placeholders
+
+    Returns:
+        dict: source, fedora_version, fedora_release_str, upstream_src, src_url, failed
+    """
+    src_url = None
+    if fedora_version != 'Not_Found' and fedora_release_str != 'Not_Found':
+        logger.info(f'pkg = {pkg} , version = {fedora_version}')
+        src_url = get_fedora_src_rpm_url(pkg, fedora_version, fedora_release_str)
+    return {'source': source, 'fedora_version': fedora_version, 'fedora_release_str': fedora_release_str,
+            'upstream_src': upstream_src, 'src_url': src_url, 'failed': failed}
+
+
+def resolve_fedora_pkgs_info(pkgs):
+    """Resolves the fedora info of many pkgs at once with the asyncio fetch engine, 
+       or a pool of fedora_lookup_workers threads when aiohttp is not installed
+
+    Args:
+        pkgs (list): package names
+
+    Yields:
+        dict: resolve_fedora_pkg_info() result of every pkg, in pkgs order
+    """
+    sources = get_fedora_sources()
+    if sources[0] == 'koji_hub':
+        try:
+            hub_infos = get_fedora_info_from_koji_hub(pkgs)
+        except requests.RequestException as e:
+            logger.error(f'koji hub unavailable, failing over to {sources[1]}: {e}')
+            sources = sources[1:]
+        else:
+            for pkg in pkgs:
+                yield make_fedora_pkg_info(pkg, 'koji_hub', *hub_infos[pkg])
+            return
+    if use_async_fetch():
+        yield from asyncio.run(resolve_fedora_pkgs_info_async(pkgs, sources))
+        return
+    if fedora_lookup_workers <= 1:
+        for pkg in pkgs:
+            yield resolve_fedora_pkg_info(pkg, sources)
+        return
+    with ThreadPoolExecutor(max_workers=fedora_lookup_workers) as executor:
+        yield from executor.map(lambda pkg: resolve_fedora_pkg_info(pkg, sources), pkgs)
+
+
+def apply_fedora_pkg_info(pkg, info, link_info=None):
+    """Updates the fedora columns of a pkg with a resolve_fedora_pkg_info() result
+
+    Args:
+        pkg (string): package name
+        info (dict): resolved fedora info
+        link_info (SrcLinkInfo): verified src_url, None if there is no src_url
+    """
+    fedora_version = info['fedora_version']
+    fedora_release_str = info['fedora_release_str']
+    upstream_src = info['upstream_src']
+    if info['source'] in ('koji_hub', 'kojipkgs_pkgid', 'kojipkgs'):
+        logger.info(f'pkg : {pkg} fedora_version : {fedora_version} fedora_release_str : {fedora_release_str}')
+        print(f'pkg : {pkg} fedora_version : {fedora_version} fedora_release_str : {fedora_release_str}') 
+        if fedora_version != 'Not_Found'and '.fc41' not in fedora_release_str: # pkg version found but no fc41, needs revisit
+            updatexl_pkg_col_value(pkg, 17, 'Not_Found')
+            fedora_rel = fedora_release_str.split('.')[-1]
+            msg = f'Needs Review: fedora_ver = {fedora_version} fedora_release = {fedora_rel}'
+            updatexl_pkg_col_value(pkg, 21, msg, revisit_color) # col 'U' 
+        else: # this will cover for both pkg fedora ver found / not found 
+            updatexl_pkg_col_value(pkg, 17, fedora_version)       
+    else:
+        if 0: #fedora_release_str != None and cur_stable_fedora_rel not in fedora_release_str and '.fc' in fedora_release_str and fedora_version != 'Not_Found':# update Q, R as Not_Found and write the contents of Q & R in U
+            updatexl_pkg_col_value(pkg, 17, 'Not_Found') # col 'Q'          
+            updatexl_pkg_col_value(pkg, 20, 'Not_Found') # col 'T' 
+            fedora_rel = fedora_release_str.split('.')[-1]
+            msg = f'Needs Review: fedora_ver = {fedora_version} fedora_release = {fedora_rel} upstream_src = {upstream_src}'
+            updatexl_pkg_col_value(pkg, 21, msg, revisit_color) # col 'U'             
+        else: 
+            # Sometimes pkg versions has chars like '~' example libtommath
+            # Sometimes pkg versions has chars like '^' example libusbmuxd
+            # Lets discard the string after encountering any special chars
+            fedora_version_stripped = discard_after_special_chars(fedora_version, special_chars)
+            if fedora_version_stripped == fedora_version : # No change
+                updatexl_pkg_col_value(pkg, 17, fedora_version_stripped) # col 'Q'
+            else:
+                updatexl_pkg_col_value(pkg, 17, fedora_version_stripped, revisit_color) # col 'Q'
+                msg = f'Needs Review:  fedora_ver = {fedora_version}'
+                updatexl_pkg_col_value(pkg, 21, msg, revisit_color) # Update Col U about the weird fedora version          
+            updatexl_pkg_col_value(pkg, 20, upstream_src) # col 'T'
+
+    if link_info != None and link_info.exists == None: # network error, not a missing src rpm
+        logger.error(f"{pkg}: {info['src_url']} could not be verified, cols 'R' & 'V' are left as they are")
+    elif link_info != None:
+        updatexl_pkg_col_value(pkg, 18, get_src_link_value(info['src_url'], link_info)) # col 'R'
+        if link_info.exists:
+            updatexl_pkg_col_value(pkg, 22, get_src_link_details(link_info)) # col 'V'
+        else:
+            updatexl_pkg_col_value(pkg, 22, None, None) # col 'V', clears the details of a link that no longer exists
+
+
 def update_latest_fedora_pkg_info() -> None:
     """update details of the pkg from fedora
     """
+    run_pkg_stage('fedora', update_latest_fedora_info_of, get_fedora_fingerprints)
 
-    for pkg in pkg_list:
-        if extract_fedora_info_from_kojipkgs_pkgid:
-            fedora_version, fedora_release_str = get_fedora_info_from_kojipkgs_pkgid(pkg)
-            logger.info(f'pkg : {pkg} fedora_version : {fedora_version} fedora_release_str : {fedora_release_str}')
-            print(f'pkg : {pkg} fedora_version : {fedora_version} fedora_release_str : {fedora_release_str}') 
-            if fedora_version != 'Not_Found'and '.fc41' not in fedora_release_str: # pkg version found but no fc41, needs revisit
-                updatexl_pkg_col_value(pkg, 17, 'Not_Found')
-                fedora_rel = fedora_release_str.split('.')[-1]
-                msg = f'Needs Review: fedora_ver = {fedora_version} fedora_release = {fedora_rel}'
-                updatexl_pkg_col_value(pkg, 21, msg, revisit_color) # col 'U' 
-            else: # this will cover for both pkg fedora ver found / not found 
-                updatexl_pkg_col_value(pkg, 17, fedora_version)       
-        elif extract_fedora_info_from_kojipkgs:
-            fedora_version, fedora_release_str = get_fedora_pkg_info_from_kojipkgs_url(pkg)
-            logger.info(f'pkg : {pkg} fedora_version : {fedora_version} fedora_release_str : {fedora_release_str}')
-            print(f'pkg : {pkg} fedora_version : {fedora_version} fedora_release_str : {fedora_release_str}') 
-            if fedora_version != 'Not_Found'and '.fc41' not in fedora_release_str: # pkg version found but no fc41, needs revisit
-                updatexl_pkg_col_value(pkg, 17, 'Not_Found')
-                fedora_rel = fedora_release_str.split('.')[-1]
-                msg = f'Needs Review: fedora_ver = {fedora_version} fedora_release = {fedora_rel}'
-                updatexl_pkg_col_value(pkg, 21, msg, revisit_color) # col 'U' 
-            else: # this will cover for both pkg fedora ver found / not found 
-                updatexl_pkg_col_value(pkg, 17, fedora_version)
-                
-        else:
-            fedora_version, fedora_release_str, upstream_src = get_fedora_pkg_info_from_pkg_url(pkg)
-            if fedora_version == 'Not_Found':
-                logger.error(f'{pkg}:info not found in pkg_url, Searching the pkg info from git')
-                fedora_version, fedora_release_str, upstream_src = get_fedora_pkg_info_from_git(pkg)
-            if 0: #fedora_release_str != None and cur_stable_fedora_rel not in fedora_release_str and '.fc' in fedora_release_str and fedora_version != 'Not_Found':# update Q, R as Not_Found and write the contents of Q & R in U
-                updatexl_pkg_col_value(pkg, 17, 'Not_Found') # col 'Q'          
-                updatexl_pkg_col_value(pkg, 20, 'Not_Found') # col 'T' 
-                fedora_rel = fedora_release_str.split('.')[-1]
-                msg = f'Needs Review: fedora_ver = {fedora_version} fedora_release = {fedora_rel} upstream_src = {upstream_src}'
-                updatexl_pkg_col_value(pkg, 21, msg, revisit_color) # col 'U'             
-            else: 
-                # Sometimes pkg versions has chars like '~' example libtommath
-                # Sometimes pkg versions has chars like '^' example libusbmuxd
-                # Lets discard the string after encountering any special chars
-                fedora_version_stripped = discard_after_special_chars(fedora_version, special_chars)
-                if fedora_version_stripped == fedora_version : # No change
-                    updatexl_pkg_col_value(pkg, 17, fedora_version_stripped) # col 'Q'
-                else:
-                    updatexl_pkg_col_value(pkg, 17, fedora_version_stripped, revisit_color) # col 'Q'
-                    msg = f'Needs Review:  fedora_ver = {fedora_version}'
-                    updatexl_pkg_col_value(pkg, 21, msg, revisit_color) # Update Col U about the weird fedora version          
-                updatexl_pkg_col_value(pkg, 20, upstream_src) # col 'T'
-        
-        if fedora_version != 'Not_Found' and fedora_release_str != 'Not_Found':
-            updatexl_fedora_src_link(pkg, fedora_version, fedora_release_str) # update col 'R'
+
+def update_latest_fedora_info_of(pkgs):
+    """update details of the given pkgs from fedora
+       pkgs are resolved concurrently, then their src rpm links are verified in one concurrent batch,
+       the results are applied in pkgs order so the output is deterministic
+
+    Args:
+        pkgs (list): package names
+    """
+    if not (extract_fedora_info_from_koji_hub or extract_fedora_info_from_kojipkgs_pkgid or extract_fedora_info_from_kojipkgs):
+        update_git_mirrors(pkgs) # the pkg_url source falls back to git
+    infos = list(resolve_fedora_pkgs_info(pkgs))
+    link_infos = verify_src_links([info['src_url'] for info in infos if info['src_url'] != None])
+    for pkg, info in zip(pkgs, infos):
+        link_info = link_infos.get(info['src_url'])
+        if info['failed'] or (link_info != None and link_info.exists == None):
+            mark_stage_failed(pkg)
+        apply_fedora_pkg_info(pkg, info, link_info)
+
+
+def get_fedora_fingerprints(pkgs):
+    """pkg -> latest koji build of the pkg, probed with the koji hub in a few batched round trips 
+       whatever the fedora source of the run is. Offline or if the hub is unavailable every pkg is re-evaluated
+
+    Args:
+        pkgs (list): package names
+
+    Returns:
+        dict: pkg -> fingerprint
+    """
+    if http_offline:
+        return {}
+    try:
+        builds = get_fedora_info_from_koji_hub(pkgs)
+    except requests.RequestException as e:
+        logger.error(f'koji hub unavailable, every pkg is re-evaluated: {e}')
+        return {}
+    source = get_fedora_sources()[0]
+    return {pkg: f'{source}|{cur_stable_fedora_rel}|{version}|{release}' for pkg, (version, release) in builds.items()}
         
 
 def update_current_pkg_versions():
     """Update current version of packages found in spec files of 2.0 & 3.0
     """
+    run_pkg_stage('versions', update_current_versions_of, get_spec_fingerprints)
+
+
+def get_spec_fingerprints(pkgs):
+    """pkg -> path & hash of its 2.0 and 3.0 spec files
+
+    Args:
+        pkgs (list): package names
+
+    Returns:
+        dict: pkg -> fingerprint
+    """
+    tree_indexes = [get_spec_index(code_dir_2_0), get_spec_index(code_dir_3_0)]
+    fingerprints = {}
+    for pkg in pkgs:
+        parts = []
+        for spec_index in tree_indexes:
+            file_path = spec_index.find(f'{pkg}.spec')
+            parts.append(f'{file_path}:{get_spec_hash(file_path)}' if file_path != None else 'Not_Found')
+        fingerprints[pkg] = '|'.join(parts)
+    return fingerprints
+
+
+def update_current_versions_of(pkgs):
+    """Update current version of the given packages found in spec files of 2.0 & 3.0
+
+    Args:
+        pkgs (list): package names
+    """
     pkg_ver_2_0 = ''
     pkg_ver_3_0 = ''
-    for pkg in pkg_list:
+    for pkg in pkgs:
         pkg_ver_2_0 = get_pkg_ver(pkg, '2_0')
         pkg_ver_3_0 = get_pkg_ver(pkg, '3_0')
         updatexl_pkg_col_value(pkg, 15, pkg_ver_2_0) # col 'O'
@@ -1107,51 +3663,76 @@ def update_current_pkg_versions():
             updatexl_pkg_col_value(pkg, 16, pkg_ver_3_0) # col 'P'
 
 
+def iter_build_state_chunks(path):
+    """Streams the 'Package' and 'State' columns of build_state.csv in chunks
+       Uses pyarrow's streaming csv reader when available, else pandas with chunksize
+
+    Args:
+        path (string): build_state.csv path
+
+    Yields:
+        tuple: list of 'Package' values, list of 'State' values
+    """
+    cols = ['Package','State']
+    if pa_csv != None:
+        reader = pa_csv.open_csv(path, convert_options=pa_csv.ConvertOptions(include_columns=cols))
+        for batch in reader:
+            yield batch.column('Package').to_pylist(), batch.column('State').to_pylist()
+    else:
+        for chunk in pd.read_csv(path, usecols=cols, chunksize=build_state_chunk_rows):
+            yield chunk['Package'].tolist(), chunk['State'].tolist()
+
+
+def load_build_state_map(path):
+    """Builds the pkg name -> (State, artifact version) map in one pass over build_state.csv
+       When a pkg is listed more than once the first row wins
+
+    Args:
+        path (string): build_state.csv path
+
+    Returns:
+        dict: pkg name -> (State, artifact version)
+    """
+    state_map = {}
+    rows = 0
+    for packages, states in iter_build_state_chunks(path):
+        rows += len(packages)
+        for bs_pkg, state in zip(packages, states):
+            if not isinstance(bs_pkg, str):
+                continue
+            bs_pkg_name = pkg_version_splitter.split(bs_pkg)
+            if bs_pkg_name[0] not in state_map:
+                state_map[bs_pkg_name[0]] = (state, bs_pkg_name[1] if len(bs_pkg_name) > 1 else 'Not_Found')
+    logger.info(f'build_state rows = {rows} pkgs = {len(state_map)}')
+    return state_map
+
+
 def update_daily_build_status() -> None:
     """Extract build status and date from the build_state.csv and update XL
     """
-    cols = ['Package','State']
-    table = pd.read_csv(build_state, usecols=cols)
-    for pkg in pkg_list:
-        pkg_state = 'Not_Found'        
-        for row in table.itertuples():
-            # bs_pkg_str = 
-            bs_pkg_name = re.split(r"-(?=\d)", row[1])
-
-            if pkg == bs_pkg_name[0]:
-                logger.info(f'bs_pkg_name:{bs_pkg_name[0]}')
-                print(f'bs_pkg_name:{bs_pkg_name[0]}')
-                pkg_state = row[2]
-                break
-        logger.info(f'{pkg}:{pkg_state}')
-        updatexl_build_status_and_date(pkg, pkg_state)
+    global build_state_map
+    build_state_map = load_build_state_map(build_state)
+    timestamp = os.path.getmtime(build_state)
+    date = datetime.fromtimestamp(timestamp).strftime('%m-%d-%Y')
+
+    def update_build_status_of(pkgs):
+        for pkg in pkgs:
+            pkg_state = build_state_map.get(pkg, ('Not_Found', 'Not_Found'))[0]
+            logger.info(f'{pkg}:{pkg_state}')
+            updatexl_build_status_and_date(pkg, pkg_state, date)
+
+    def get_build_state_fingerprints(pkgs):
+        return {pkg: f'{build_state_map.get(pkg, ("Not_Found", "Not_Found"))[0]}|{date}' for pkg in pkgs}
+
+    run_pkg_stage('build_state', update_build_status_of, get_build_state_fingerprints)
 
 
 def update_pkg_status():
     """ For every package compare the values from "Need Upgrade",col D 
         and "Daily build status", col M and update pkg "Status", col H
     """
-    pkg_status = ['Not_Started', 'Ongoing', 'PR Raised', 'PR in Review', 'Done-Upgrade', 'Done-FixBuild', 'Done-OtherChanges', 'NA-Uptodate']
-    # Load the workbook
-    wb = openpyxl.load_workbook(workbook)  
-    # Access the worksheet (assuming it's the first sheet) 
-    ws = wb.active
-    for pkg in pkg_list:
-        need_upgrade = ''
-        build_status = ''    
-        for r in ws.iter_rows(min_row=3, values_only=True):
-            if r[2] != None:
-                if r[2].strip(' \t\n\r') == pkg: #Skip row 0 & 1 , pkg info starts from row 2
-                    need_upgrade = ws.cell(row=r[1]+2, column=4).value # col 'D'
-                    build_status = ws.cell(row=r[1]+2, column=13).value # col 'M'
-                    if build_status == 'Y' and need_upgrade == 'Y':
-                        updatexl_pkg_col_value(pkg, 8, pkg_status[0]) # col 'H'
-                    elif build_status == 'Y' and need_upgrade == 'N':
-                        updatexl_pkg_col_value(pkg, 8, pkg_status[7]) # col 'H'
-                    elif build_status == 'N' and need_upgrade == 'N':
-                        updatexl_pkg_col_value(pkg, 8, pkg_status[0]) # col 'H'
-                    else:
-                        updatexl_pkg_col_value(pkg, 8, pkg_status[0]) # col 'H'    
+    pkg_status = decide_pkg_status(pkg_table.column(13), pkg_table.column(4)) # col 'M', 'D'
+    updatexl_col_values(8, pkg_status, [white_color] * len(pkg_status)) # col 'H'
         
 
 def submit_entries():
@@ -1210,6 +3791,18 @@ def get_file_paths_from_user():
 
     window.mainloop()    
 
+
+def save_persistent_caches():
+    """Saves the caches reused by the next runs
+    """
+    try:
+        save_spec_parse_cache()
+        save_http_cache()
+        save_git_mirrors()
+        save_incremental_state()
+    except Exception as e:
+        logger.exception(f'Error saving persistent caches: {e}')
+
                 
 def calculate_time(func: Callable[[], None]) -> Callable[[], None]:
     """Decorator to calculate duration taken by any function.
@@ -1259,22 +3852,30 @@ def cleanup_xl_sheet():
         Remove version number
         Delete empty rows
     """
-    wb = openpyxl.load_workbook(workbook)  
-    ws = wb.active
-    # Iterate over rows and delete based on a condition
-
-    for row in range(ws.max_row+1, 1, -1):  ##range is from bottom to top, step -1 
-        if ws[row][1].value is None:
-            ws.delete_rows(idx=row, amount = 1)
-    wb.save(workbook)
-    
-    for row in ws.iter_rows(min_row=3, values_only=True): #min_row=3 as pkg names start from row 3        
-        if row[2] != None:
-            pkg = row[2].strip(' \t\n\r')
-            # pkg_list.append(pkg) # row[2] = our col 'C'
-            pkg = re.split(r"-(?=\d)", pkg)
-            ws.cell(row=row[1]+2, column=3).value = pkg[0]
-    wb.save(workbook)
+    ws = xl_session.ws
+    if xl_session.streaming: # rows are cleaned up while they are streamed, see StreamingSheetView & write_streamed_workbook()
+        build_pkg_row_index(ws)
+        xl_session.mark_dirty()
+        return
+    # One compaction pass: every kept row is moved up once to its final position, the pkg
+    # version suffix is stripped on the way and the empty rows left at the bottom are deleted at once
+    max_row = ws.max_row
+    last_col = get_column_letter(ws.max_column)
+    dst = 2
+    for src, row in enumerate(ws.iter_rows(min_row=2, max_row=max_row, max_col=3, values_only=True), start=2):
+        if is_empty_xl_row(src, row):
+            continue
+        if src != dst:
+            ws.move_range(f'A{src}:{last_col}{src}', rows=dst-src)
+        if dst >= 3 and row[2] != None: #pkg names start from row 3
+            ws.cell(row=dst, column=3).value = clean_pkg_name(row[2])
+        dst += 1
+    if dst <= max_row:
+        logger.info(f'deleting {max_row - dst + 1} empty rows')
+        ws.delete_rows(idx=dst, amount=max_row - dst + 1)
+    xl_session.mark_dirty()
+
+    build_pkg_row_index(ws) # rows moved and pkg names changed, keep the index in sync
     
 # Main function
 @calculate_time
@@ -1290,25 +3891,36 @@ def main() -> None:
     # extract_src_rpm(f'{pkg}.src.rpm', f'{pkg}')
     print('Now Processing ........Please wait')
     print('For more info you may refer the log file: pkg_update_analysis.log')
-    cleanup_xl_sheet()
-    print('Now Processing: read_all_pkg_names. Please wait.........')
-    logger.info('Now Processing: read_all_pkg_names. Please wait.........')
-    read_all_pkg_names()
-    print('Now Processing: update_daily_build_status. Please wait.........')
-    logger.info('Now Processing: update_daily_build_status. Please wait.........')
-    update_daily_build_status()
-    print('Now Processing: update_current_pkg_versions. Please wait.........')
-    logger.info('Now Processing: update_current_pkg_versions. Please wait.........')
-    update_current_pkg_versions()
-    print('Now Processing: update_latest_fedora_pkg_info. Please wait.........')
-    logger.info('Now Processing: update_latest_fedora_pkg_info. Please wait.........')
-    update_latest_fedora_pkg_info()
-    print('Now Processing: update_if_need_upgrade. Please wait.........')
-    logger.info('Now Processing: update_if_need_upgrade. Please wait.........')
-    update_if_need_upgrade()
-    print('Now Processing: update_pkg_status. Please wait.........')
-    logger.info('Now Processing: update_pkg_status. Please wait.........')
-    update_pkg_status()
+    open_xl_session() # workbook is loaded once here and saved once in close_xl_session()
+    completed = False
+    try:
+        cleanup_xl_sheet()
+        print('Now Processing: read_all_pkg_names. Please wait.........')
+        logger.info('Now Processing: read_all_pkg_names. Please wait.........')
+        read_all_pkg_names()
+        start_run_journal() # on --resume the results of the interrupted run are replayed here
+        print('Now Processing: update_daily_build_status. Please wait.........')
+        logger.info('Now Processing: update_daily_build_status. Please wait.........')
+        update_daily_build_status()
+        print('Now Processing: update_current_pkg_versions. Please wait.........')
+        logger.info('Now Processing: update_current_pkg_versions. Please wait.........')
+        update_current_pkg_versions()
+        print('Now Processing: update_latest_fedora_pkg_info. Please wait.........')
+        logger.info('Now Processing: update_latest_fedora_pkg_info. Please wait.........')
+        update_latest_fedora_pkg_info()
+        print('Now Processing: update_if_need_upgrade. Please wait.........')
+        logger.info('Now Processing: update_if_need_upgrade. Please wait.........')
+        update_if_need_upgrade()
+        print('Now Processing: update_pkg_status. Please wait.........')
+        logger.info('Now Processing: update_pkg_status. Please wait.........')
+        update_pkg_status()
+        completed = True
+    finally:
+        print('Now Saving the workbook. Please wait.........')
+        close_xl_session()
+        close_run_journal(completed)
+        save_persistent_caches()
+        log_http_conn_stats()
     print('All Processing: DONE')
     logger.info('All Processing: DONE')
     while True:
@@ -1319,4 +3931,17 @@ def main() -> None:
             print("You entered:", user_input)
 
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description='Package update analysis of the workbook, the paths are entered in the GUI')
+    parser.add_argument('--incremental', action='store_true', help='only re-evaluate the pkgs whose spec files, build state or latest koji build changed since the last incremental run')
+    parser.add_argument('--resume', action='store_true', help='continue an interrupted run from its journal instead of starting over')
+    parser.add_argument('--bench-html', metavar='DIR', help='benchmark the html parser backends on the koji / kojipkgs pages saved in DIR and exit')
+    parser.add_argument('--bench-versions', metavar='FILE', nargs='?', const='', help='benchmark the version comparator on the versions in FILE (default: generated ones) and exit')
+    args = parser.parse_args()
+    if args.bench_html:
+        bench_html_parsers(args.bench_html)
+    elif args.bench_versions != None:
+        bench_version_compare(args.bench_versions)
+    else:
+        incremental_mode = args.incremental
+        resume_mode = args.resume
+        main()
\ No newline at end of file